@@ -1,12 +1,12 @@
 from __future__ import annotations
 import json
 from dataclasses import asdict, dataclass
-from typing import Optional
+from typing import Optional, List
 
 import itsdangerous
 from app import config
 from app.log import LOG
-from app.models import User, AliasOptions, SLDomain
+from app.models import User, AliasOptions, SLDomain, CustomDomain
 
 signer = itsdangerous.TimestampSigner(config.CUSTOM_ALIAS_SECRET)
 
@@ -43,13 +43,21 @@ def check_suffix_signature(signed_suffix: str) -> Optional[str]:
 
 
 def verify_prefix_suffix(
-    user: User, alias_prefix, alias_suffix, alias_options: Optional[AliasOptions] = None
+    user: User,
+    alias_prefix,
+    alias_suffix,
+    alias_options: Optional[AliasOptions] = None,
+    custom_domains: Optional[List[CustomDomain]] = None,
 ) -> bool:
-    """verify if user could create an alias with the given prefix and suffix"""
+    """verify if user could create an alias with the given prefix and suffix
+    custom_domains can be passed when the user verified custom domains are already loaded
+    """
     if not alias_prefix or not alias_suffix:  # should be caught on frontend
         return False
 
-    user_custom_domains = [cd.domain for cd in user.verified_custom_domains()]
+    if custom_domains is None:
+        custom_domains = user.verified_custom_domains()
+    user_custom_domains = [cd.domain for cd in custom_domains]
 
     # make sure alias_suffix is either .random_word@simplelogin.co or @my-domain.com
     alias_suffix = alias_suffix.strip()
@@ -92,18 +100,22 @@ def verify_prefix_suffix(
 
 
 def get_alias_suffixes(
-    user: User, alias_options: Optional[AliasOptions] = None
+    user: User,
+    alias_options: Optional[AliasOptions] = None,
+    custom_domains: Optional[List[CustomDomain]] = None,
 ) -> [AliasSuffix]:
     """
     Similar to as get_available_suffixes() but also return custom domain that doesn't have MX set up.
+    custom_domains can be passed when the user verified custom domains are already loaded
     """
-    user_custom_domains = user.verified_custom_domains()
+    if custom_domains is None:
+        custom_domains = user.verified_custom_domains()
 
     alias_suffixes: [AliasSuffix] = []
 
     # put custom domain first
     # for each user domain, generate both the domain and a random suffix version
-    for custom_domain in user_custom_domains:
+    for custom_domain in custom_domains:
         if custom_domain.random_prefix_generation:
             suffix = (
                 f".{user.get_random_alias_suffix(custom_domain)}@{custom_domain.domain}"
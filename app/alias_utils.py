@@ -372,17 +372,11 @@ def nb_email_log_for_mailbox(mailbox: Mailbox):
 
 
 # Only lowercase letters, numbers, dots (.), dashes (-) and underscores (_) are currently supported
-_ALIAS_PREFIX_PATTERN = r"[0-9a-z-_.]{1,}"
+_ALIAS_PREFIX_REGEX = re.compile(r"[0-9a-z-_.]{1,40}")
 
 
 def check_alias_prefix(alias_prefix) -> bool:
-    if len(alias_prefix) > 40:
-        return False
-
-    if re.fullmatch(_ALIAS_PREFIX_PATTERN, alias_prefix) is None:
-        return False
-
-    return True
+    return _ALIAS_PREFIX_REGEX.fullmatch(alias_prefix) is not None
 
 
 def alias_export_csv(user, csv_direct_export=False):
@@ -298,9 +298,7 @@ def auth_facebook():
         Session.commit()
         email_utils.send_welcome_email(user)
 
-    if not SocialAuth.get_by(user_id=user.id, social="facebook"):
-        SocialAuth.create(user_id=user.id, social="facebook")
-        Session.commit()
+    SocialAuth.record(user.id, "facebook")
 
     return jsonify(**auth_payload(user, device)), 200
 
@@ -352,9 +350,7 @@ def auth_google():
         Session.commit()
         email_utils.send_welcome_email(user)
 
-    if not SocialAuth.get_by(user_id=user.id, social="google"):
-        SocialAuth.create(user_id=user.id, social="google")
-        Session.commit()
+    SocialAuth.record(user.id, "google")
 
     return jsonify(**auth_payload(user, device)), 200
 
@@ -3,13 +3,12 @@ from requests_oauthlib import OAuth2Session
 from requests_oauthlib.compliance_fixes import facebook_compliance_fix
 
 from app.auth.base import auth_bp
-from app.auth.views.google import create_file_from_url
 from app.config import (
     URL,
     FACEBOOK_CLIENT_ID,
     FACEBOOK_CLIENT_SECRET,
 )
-from app.db import Session
+from app.jobs.sync_profile_picture_job import SyncProfilePictureJob
 from app.log import LOG
 from app.models import User, SocialAuth
 from .login_utils import after_login
@@ -99,10 +98,8 @@ def facebook_callback():
 
     if user:
         if picture_url and not user.profile_picture_id:
-            LOG.d("set user profile picture to %s", picture_url)
-            file = create_file_from_url(user, picture_url)
-            user.profile_picture_id = file.id
-            Session.commit()
+            LOG.d("schedule setting user profile picture to %s", picture_url)
+            SyncProfilePictureJob(user, picture_url).store_job_in_db()
 
     else:
         flash(
@@ -120,8 +117,6 @@ def facebook_callback():
         # reset the next_url to avoid user getting redirected at each login :)
         session.pop("facebook_next_url", None)
 
-    if not SocialAuth.get_by(user_id=user.id, social="facebook"):
-        SocialAuth.create(user_id=user.id, social="facebook")
-        Session.commit()
+    SocialAuth.record(user.id, "facebook")
 
     return after_login(user, next_url)
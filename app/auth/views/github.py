@@ -4,7 +4,7 @@ from requests_oauthlib import OAuth2Session
 from app.auth.base import auth_bp
 from app.auth.views.login_utils import after_login
 from app.config import GITHUB_CLIENT_ID, GITHUB_CLIENT_SECRET, URL
-from app.db import Session
+from app.http_utils import mount_pooled_adapter
 from app.log import LOG
 from app.models import User, SocialAuth
 from app.utils import encode_url, sanitize_email, sanitize_next_url
@@ -12,6 +12,8 @@ from app.utils import encode_url, sanitize_email, sanitize_next_url
 _authorization_base_url = "https://github.com/login/oauth/authorize"
 _token_url = "https://github.com/login/oauth/access_token"
 
+_scope = ["user:email"]
+
 # need to set explicitly redirect_uri instead of leaving the lib to pre-fill redirect_uri
 # when served behind nginx, the redirect_uri is localhost... and not the real url
 _redirect_uri = URL + "/auth/github/callback"
@@ -21,13 +23,11 @@ _redirect_uri = URL + "/auth/github/callback"
 def github_login():
     next_url = sanitize_next_url(request.args.get("next"))
     if next_url:
-        redirect_uri = _redirect_uri + "?next=" + encode_url(next_url)
+        redirect_uri = f"{_redirect_uri}?next={encode_url(next_url)}"
     else:
         redirect_uri = _redirect_uri
 
-    github = OAuth2Session(
-        GITHUB_CLIENT_ID, scope=["user:email"], redirect_uri=redirect_uri
-    )
+    github = OAuth2Session(GITHUB_CLIENT_ID, scope=_scope, redirect_uri=redirect_uri)
     authorization_url, state = github.authorization_url(_authorization_base_url)
 
     # State is used to prevent CSRF, keep this for later.
@@ -45,18 +45,16 @@ def github_callback():
     github = OAuth2Session(
         GITHUB_CLIENT_ID,
         state=session["oauth_state"],
-        scope=["user:email"],
+        scope=_scope,
         redirect_uri=_redirect_uri,
     )
+    mount_pooled_adapter(github)
     github.fetch_token(
         _token_url,
         client_secret=GITHUB_CLIENT_SECRET,
         authorization_response=request.url,
     )
 
-    # a dict with "name", "login"
-    github_user_data = github.get("https://api.github.com/user").json()
-
     # return list of emails
     # {
     #     'email': 'abcd@gmail.com',
@@ -67,14 +65,14 @@ def github_callback():
     emails = github.get("https://api.github.com/user/emails").json()
 
     # only take the primary email
-    email = None
-
-    for e in emails:
-        if e.get("verified") and e.get("primary"):
-            email = e.get("email")
-            break
+    email = next(
+        (e.get("email") for e in emails if e.get("primary") and e.get("verified")),
+        None,
+    )
 
     if not email:
+        # a dict with "name", "login", only needed to identify the user in the log
+        github_user_data = github.get("https://api.github.com/user").json()
         LOG.e(f"cannot get email for github user {github_user_data} {emails}")
         flash(
             "Cannot get a valid email from Github, please another way to login/sign up",
@@ -92,9 +90,7 @@ def github_callback():
         )
         return redirect(url_for("auth.register"))
 
-    if not SocialAuth.get_by(user_id=user.id, social="github"):
-        SocialAuth.create(user_id=user.id, social="github")
-        Session.commit()
+    SocialAuth.record(user.id, "github")
 
     # The activation link contains the original page, for ex authorize page
     next_url = sanitize_next_url(request.args.get("next")) if request.args else None
@@ -1,13 +1,13 @@
 from flask import request, session, redirect, flash, url_for
 from requests_oauthlib import OAuth2Session
 
-from app import s3
 from app.auth.base import auth_bp
 from app.config import URL, GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
-from app.db import Session
+from app.http_utils import mount_pooled_adapter
 from app.log import LOG
-from app.models import User, File, SocialAuth
-from app.utils import random_string, sanitize_email, sanitize_next_url
+from app.jobs.sync_profile_picture_job import SyncProfilePictureJob
+from app.models import User, SocialAuth
+from app.utils import sanitize_email, sanitize_next_url
 from .login_utils import after_login
 
 _authorization_base_url = "https://accounts.google.com/o/oauth2/v2/auth"
@@ -58,6 +58,7 @@ def google_callback():
         scope=_scope,
         redirect_uri=_redirect_uri,
     )
+    mount_pooled_adapter(google)
     google.fetch_token(
         _token_url,
         client_secret=GOOGLE_CLIENT_SECRET,
@@ -86,10 +87,8 @@ def google_callback():
 
     if user:
         if picture_url and not user.profile_picture_id:
-            LOG.d("set user profile picture to %s", picture_url)
-            file = create_file_from_url(user, picture_url)
-            user.profile_picture_id = file.id
-            Session.commit()
+            LOG.d("schedule setting user profile picture to %s", picture_url)
+            SyncProfilePictureJob(user, picture_url).store_job_in_db()
     else:
         flash(
             "Sorry you cannot sign up via Google, please use email/password sign-up instead",
@@ -106,20 +105,6 @@ def google_callback():
         # reset the next_url to avoid user getting redirected at each login :)
         session.pop("google_next_url", None)
 
-    if not SocialAuth.get_by(user_id=user.id, social="google"):
-        SocialAuth.create(user_id=user.id, social="google")
-        Session.commit()
+    SocialAuth.record(user.id, "google")
 
     return after_login(user, next_url)
-
-
-def create_file_from_url(user, url) -> File:
-    file_path = random_string(30)
-    file = File.create(path=file_path, user_id=user.id)
-
-    s3.upload_from_url(url, file_path)
-
-    Session.flush()
-    LOG.d("upload file %s to s3", file)
-
-    return file
@@ -109,9 +109,7 @@ def oidc_callback():
     elif not user:
         user = create_user(email, oidc_user_data)
 
-    if not SocialAuth.get_by(user_id=user.id, social="oidc"):
-        SocialAuth.create(user_id=user.id, social="oidc")
-        Session.commit()
+    SocialAuth.record(user.id, "oidc")
 
     # The activation link contains the original page, for ex authorize page
     next_url = session[SESSION_NEXT_KEY]
@@ -18,6 +18,7 @@ from app.config import (
     URL,
     ALLOWED_OAUTH_SCHEMES,
 )
+from app.http_utils import mount_pooled_adapter
 from app.log import LOG
 from app.models import ApiKey, User
 from app.proton.proton_callback_handler import (
@@ -85,8 +86,8 @@ def proton_login():
     next_url = sanitize_next_url(request.args.get("next"))
     if next_url:
         session["oauth_next"] = next_url
-    elif "oauth_next" in session:
-        del session["oauth_next"]
+    else:
+        session.pop("oauth_next", None)
 
     scheme = sanitize_scheme(request.args.get("scheme"))
     if scheme:
@@ -94,8 +95,8 @@ def proton_login():
             flash("Bad OAuth request", "error")
             return redirect(url_for("auth.login"))
         session["oauth_scheme"] = scheme
-    elif "oauth_scheme" in session:
-        del session["oauth_scheme"]
+    else:
+        session.pop("oauth_scheme", None)
 
     mode = request.args.get("mode", "session")
     if mode == "apikey":
@@ -114,7 +115,7 @@ def proton_login():
 
 @auth_bp.route("/proton/callback")
 def proton_callback():
-    if SESSION_STATE_KEY not in session or SESSION_STATE_KEY not in session:
+    if SESSION_STATE_KEY not in session or SESSION_ACTION_KEY not in session:
         flash("Invalid state, please retry", "error")
         return redirect(url_for("auth.login"))
     if PROTON_CLIENT_ID is None or PROTON_CLIENT_SECRET is None:
@@ -130,6 +131,7 @@ def proton_callback():
         state=session[SESSION_STATE_KEY],
         redirect_uri=_redirect_uri,
     )
+    mount_pooled_adapter(proton)
 
     def check_status_code(response: requests.Response) -> requests.Response:
         if response.status_code != 200:
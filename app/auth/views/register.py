@@ -1,7 +1,10 @@
+import secrets
+
 import requests
 from flask import request, flash, render_template, redirect, url_for
 from flask_login import current_user
 from flask_wtf import FlaskForm
+from sqlalchemy.dialects.postgresql import insert
 from wtforms import StringField, validators
 
 from app import email_utils, config
@@ -16,9 +19,14 @@ from app.email_utils import (
     personal_email_already_used,
 )
 from app.events.auth_event import RegisterEvent
+from app.http_utils import mount_pooled_adapter
 from app.log import LOG
 from app.models import User, ActivationCode, DailyMetric
-from app.utils import random_string, encode_url, sanitize_email, canonicalize_email
+from app.utils import encode_url, sanitize_email, canonicalize_email
+
+# (connect, read) timeouts in seconds: a slow hCaptcha should not hold the worker
+_HCAPTCHA_TIMEOUT = (3, 5)
+_hcaptcha_http = mount_pooled_adapter(requests.Session())
 
 
 class RegisterForm(FlaskForm):
@@ -49,9 +57,15 @@ def register():
             # check with hCaptcha
             token = request.form.get("h-captcha-response")
             params = {"secret": HCAPTCHA_SECRET, "response": token}
-            hcaptcha_res = requests.post(
-                "https://hcaptcha.com/siteverify", data=params
-            ).json()
+            try:
+                hcaptcha_res = _hcaptcha_http.post(
+                    "https://hcaptcha.com/siteverify",
+                    data=params,
+                    timeout=_HCAPTCHA_TIMEOUT,
+                ).json()
+            except requests.RequestException as e:
+                LOG.w("Cannot verify captcha: %s", e)
+                hcaptcha_res = {"success": False}
             # return something like
             # {'success': True,
             #  'challenge_ts': '2020-07-23T10:03:25',
@@ -92,14 +106,15 @@ def register():
                     password=form.password.data,
                     referral=get_referral(),
                 )
-                Session.commit()
 
                 try:
-                    send_activation_email(user, next_url)
+                    # the user, its activation code and the metric are committed together
+                    send_activation_email(user, next_url, commit=False)
                     RegisterEvent(RegisterEvent.ActionType.success).send()
                     DailyMetric.get_or_create_today_metric().nb_new_web_non_proton_user += 1
                     Session.commit()
                 except Exception:
+                    Session.rollback()
                     flash("Invalid email, are you sure the email is correct?", "error")
                     RegisterEvent(RegisterEvent.ActionType.invalid_email).send()
                     return redirect(url_for("auth.register"))
@@ -117,14 +132,26 @@ def register():
     )
 
 
-def send_activation_email(user, next_url):
-    # the activation code is valid for 1h and delete all previous codes
-    Session.query(ActivationCode).filter(ActivationCode.user_id == user.id).delete()
-    activation = ActivationCode.create(user_id=user.id, code=random_string(30))
-    Session.commit()
+def send_activation_email(user, next_url, commit: bool = True):
+    # the activation code is valid for 1h and replaces any previous code
+    insert_stmt = insert(ActivationCode).values(
+        user_id=user.id, code=secrets.token_urlsafe(22)
+    )
+    activation_code = Session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[ActivationCode.user_id],
+            set_={
+                "code": insert_stmt.excluded.code,
+                "expired": insert_stmt.excluded.expired,
+                "created_at": insert_stmt.excluded.created_at,
+            },
+        ).returning(ActivationCode.code)
+    ).scalar()
+    if commit:
+        Session.commit()
 
     # Send user activation email
-    activation_link = f"{URL}/auth/activate?code={activation.code}"
+    activation_link = f"{URL}/auth/activate?code={activation_code}"
     if next_url:
         LOG.d("redirect user to %s after activation", next_url)
         activation_link = activation_link + "&next=" + encode_url(next_url)
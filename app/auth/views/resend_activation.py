@@ -22,7 +22,7 @@ def resend_activation():
     if form.validate_on_submit():
         email = sanitize_email(form.email.data)
         canonical_email = canonicalize_email(email)
-        user = User.get_by(email=email) or User.get_by(email=canonical_email)
+        user = User.get_by_email_or_canonical_email(email, canonical_email)
 
         if not user:
             flash("There is no such email", "warning")
@@ -20,3 +20,5 @@ class JobType(enum.Enum):
     SEND_EVENT_TO_WEBHOOK = "send-event-to-webhook"
     SYNC_SUBSCRIPTION = "sync-subscription"
     ABUSER_MARK = "abuser-mark"
+    SYNC_PROFILE_PICTURE = "sync-profile-picture"
+    SEND_ADMIN_EMAIL = "send-admin-email"
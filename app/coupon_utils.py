@@ -3,11 +3,10 @@ from typing import Optional
 import arrow
 from sqlalchemy import or_, update, and_
 
-from app.config import ADMIN_EMAIL
 from app.db import Session
-from app.email_utils import send_email
 from app.events.event_dispatcher import EventDispatcher
 from app.events.generated.event_pb2 import EventContent, UserPlanChanged
+from app.jobs.send_admin_email_job import SendAdminEmailJob
 from app.log import LOG
 from app.models import (
     User,
@@ -122,9 +121,10 @@ def redeem_lifetime_coupon(coupon_code: str, user: User) -> Optional[Coupon]:
             )
         )
         .values(nb_used=LifetimeCoupon.nb_used - 1)
+        .returning(LifetimeCoupon.nb_used)
     )
-    res = Session.execute(stmt)
-    if res.rowcount == 0:
+    nb_used = Session.execute(stmt).scalar()
+    if nb_used is None:
         LOG.i("Coupon could not be redeemed")
         return None
 
@@ -136,14 +136,10 @@ def redeem_lifetime_coupon(coupon_code: str, user: User) -> Optional[Coupon]:
         user=user,
         content=EventContent(user_plan_change=UserPlanChanged(lifetime=True)),
     )
+    # notify admin, sent by the job runner to keep SMTP out of the request
+    SendAdminEmailJob(
+        subject=f"User {user} used lifetime coupon({coupon.comment}). Coupon nb_used: {nb_used}",
+    ).store_job_in_db(commit=False)
     Session.commit()
 
-    # notify admin
-    send_email(
-        ADMIN_EMAIL,
-        subject=f"User {user} used lifetime coupon({coupon.comment}). Coupon nb_used: {coupon.nb_used}",
-        plaintext="",
-        html="",
-    )
-
     return coupon
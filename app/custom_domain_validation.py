@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Optional
 
@@ -6,6 +7,7 @@ from app.constants import DMARC_RECORD
 from app.db import Session
 from app.dns_utils import (
     DNSClient,
+    InMemoryDNSClient,
     get_network_dns_client,
 )
 from app.models import CustomDomain
@@ -52,6 +54,10 @@ def is_mx_equivalent(
     return True
 
 
+# MX + 2 TXT + 3 DKIM CNAME lookups
+_DNS_PREFETCH_WORKERS = 6
+
+
 class CustomDomainValidation:
     def __init__(
         self,
@@ -282,6 +288,54 @@ class CustomDomainValidation:
             Session.commit()
             return DomainValidationResult(success=False, errors=txt_records)
 
+    def validate_all_records(self, custom_domain: CustomDomain) -> dict:
+        """
+        Run every validation for the custom domain at once.
+        The DNS lookups are done concurrently upfront, the validations then run sequentially on the current thread
+        as they update the custom domain and commit the session.
+        Ownership is only checked if it isn't verified yet.
+        """
+        validator = CustomDomainValidation(
+            dkim_domain=self.dkim_domain,
+            dns_client=self.__prefetch_dns_records(custom_domain),
+            partner_domains=self._partner_domains,
+            partner_domains_validation_prefixes=self._partner_domain_validation_prefixes,
+        )
+        results = {}
+        if not custom_domain.ownership_verified:
+            results["ownership"] = validator.validate_domain_ownership(custom_domain)
+        results["mx"] = validator.validate_mx_records(custom_domain)
+        results["spf"] = validator.validate_spf_records(custom_domain)
+        results["dkim"] = validator.validate_dkim_records(custom_domain)
+        results["dmarc"] = validator.validate_dmarc_records(custom_domain)
+        return results
+
+    def __prefetch_dns_records(self, custom_domain: CustomDomain) -> InMemoryDNSClient:
+        domain = custom_domain.domain
+        txt_hostnames = [domain, "_dmarc." + domain]
+        cname_hostnames = [
+            f"{prefix}.{domain}" for prefix in self.get_dkim_records(custom_domain)
+        ]
+
+        with ThreadPoolExecutor(max_workers=_DNS_PREFETCH_WORKERS) as executor:
+            mx_future = executor.submit(self._dns_client.get_mx_domains, domain)
+            txt_futures = {
+                hostname: executor.submit(self._dns_client.get_txt_record, hostname)
+                for hostname in txt_hostnames
+            }
+            cname_futures = {
+                hostname: executor.submit(self._dns_client.get_cname_record, hostname)
+                for hostname in cname_hostnames
+            }
+
+        dns_client = InMemoryDNSClient()
+        dns_client.set_mx_records(domain, mx_future.result())
+        for hostname, future in txt_futures.items():
+            dns_client.set_txt_record(hostname, future.result())
+        for hostname, future in cname_futures.items():
+            dns_client.set_cname_record(hostname, future.result())
+        return dns_client
+
     def __clean_spf_records(
         self, txt_records: List[str], custom_domain: CustomDomain
     ) -> List[str]:
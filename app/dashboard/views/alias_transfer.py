@@ -17,23 +17,29 @@ from app.log import LOG
 from app.models import (
     Alias,
 )
-from app.models import Mailbox
+from app.mailbox_utils import get_verified_mailboxes_by_ids
 from app.utils import CSRFValidationForm
 
 
 def hmac_alias_transfer_token(transfer_token: str) -> str:
-    alias_hmac = hmac.new(
+    alias_hmac = hmac.digest(
         config.ALIAS_TRANSFER_TOKEN_SECRET.encode("utf-8"),
         transfer_token.encode("utf-8"),
         "sha3_224",
     )
-    return base64.urlsafe_b64encode(alias_hmac.digest()).decode("utf-8").rstrip("=")
+    return base64.urlsafe_b64encode(alias_hmac).decode("utf-8").rstrip("=")
 
 
 @dashboard_bp.route("/alias_transfer/send/<int:alias_id>/", methods=["GET", "POST"])
 @login_required
 @sudo_required
 def alias_transfer_send_route(alias_id):
+    csrf_form = CSRFValidationForm()
+    # reject forged requests before touching the database
+    if request.method == "POST" and not csrf_form.validate():
+        flash("Invalid request", "warning")
+        return redirect(request.url)
+
     alias = Alias.get(alias_id)
     if not alias or alias.user_id != current_user.id:
         flash("You cannot see this page", "warning")
@@ -47,17 +53,14 @@ def alias_transfer_send_route(alias_id):
         return redirect(url_for("dashboard.index"))
 
     alias_transfer_url = None
-    csrf_form = CSRFValidationForm()
+    now = arrow.utcnow()
 
     if request.method == "POST":
-        if not csrf_form.validate():
-            flash("Invalid request", "warning")
-            return redirect(request.url)
         # generate a new transfer_token
         if request.form.get("form-name") == "create":
             transfer_token = f"{alias.id}.{secrets.token_urlsafe(32)}"
             alias.transfer_token = hmac_alias_transfer_token(transfer_token)
-            alias.transfer_token_expiration = arrow.utcnow().shift(hours=24)
+            alias.transfer_token_expiration = now.shift(hours=24)
 
             emit_alias_audit_log(
                 alias,
@@ -84,7 +87,7 @@ def alias_transfer_send_route(alias_id):
         alias=alias,
         alias_transfer_url=alias_transfer_url,
         link_active=alias.transfer_token_expiration is not None
-        and alias.transfer_token_expiration > arrow.utcnow(),
+        and alias.transfer_token_expiration > now,
         csrf_form=csrf_form,
     )
 
@@ -100,20 +103,16 @@ def alias_transfer_receive_route():
     if not token:
         flash("Invalid transfer token", "error")
         return redirect(url_for("dashboard.index"))
-    hashed_token = hmac_alias_transfer_token(token)
-    # TODO: Don't allow unhashed tokens once all the tokens have been migrated to the new format
-    alias = Alias.get_by(transfer_token=token) or Alias.get_by(
-        transfer_token=hashed_token
-    )
+    alias = Alias.get_by(transfer_token=hmac_alias_transfer_token(token))
 
     if not alias:
         flash("Invalid link", "error")
         return redirect(url_for("dashboard.index"))
 
-    # TODO: Don't allow none once all the tokens have been migrated to the new format
+    # every token has an expiration since the b2d4f6a8c0e1 migration
     if (
-        alias.transfer_token_expiration is not None
-        and alias.transfer_token_expiration < arrow.utcnow()
+        alias.transfer_token_expiration is None
+        or alias.transfer_token_expiration < arrow.utcnow()
     ):
         flash("Expired link, please request a new one", "error")
         return redirect(url_for("dashboard.index"))
@@ -137,23 +136,16 @@ def alias_transfer_receive_route():
     if request.method == "POST":
         mailbox_ids = request.form.getlist("mailbox_ids")
         # check if mailbox is not tempered with
-        mailboxes = []
-        for mailbox_id in mailbox_ids:
-            mailbox = Mailbox.get(mailbox_id)
-            if (
-                not mailbox
-                or mailbox.user_id != current_user.id
-                or not mailbox.verified
-            ):
-                flash("Something went wrong, please retry", "warning")
-                return redirect(request.url)
-            if mailbox.is_admin_disabled():
-                flash(
-                    "Cannot assign admin-disabled mailbox. Please contact support.",
-                    "error",
-                )
-                return redirect(request.url)
-            mailboxes.append(mailbox)
+        mailboxes = get_verified_mailboxes_by_ids(current_user, mailbox_ids)
+        if mailboxes is None:
+            flash("Something went wrong, please retry", "warning")
+            return redirect(request.url)
+        if any(mailbox.is_admin_disabled() for mailbox in mailboxes):
+            flash(
+                "Cannot assign admin-disabled mailbox. Please contact support.",
+                "error",
+            )
+            return redirect(request.url)
 
         if not mailboxes:
             flash("You must select at least 1 mailbox", "warning")
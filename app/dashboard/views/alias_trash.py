@@ -1,6 +1,7 @@
 from flask import render_template, flash, request, redirect, url_for
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
+from sqlalchemy import func
 from wtforms import StringField, IntegerField
 
 from app import alias_delete
@@ -50,18 +51,26 @@ def alias_trash():
             except CannotCreateAliasQuotaExceeded:
                 flash("You do not have enough quota to restore all aliases", "error")
 
-    alias_in_trash = (
-        Session.query(Alias)
+    # the window function returns the total number of trashed aliases with each row
+    rows = (
+        Session.query(Alias, func.count().over())
         .filter(Alias.user_id == current_user.id, Alias.delete_on != None)  # noqa: E711
         .order_by(Alias.delete_on.asc())
         .limit(PAGE_LIMIT)
         .offset(page * PAGE_LIMIT)
     ).all()
-    alias_trash_count = (
-        Session.query(Alias)
-        .filter(Alias.user_id == current_user.id, Alias.delete_on != None)  # noqa: E711
-        .count()
-    )
+    alias_in_trash = [alias for alias, _ in rows]
+    if rows:
+        alias_trash_count = rows[0][1]
+    elif page == 0:
+        alias_trash_count = 0
+    else:
+        # page out of range: no row to carry the total
+        alias_trash_count = (
+            Session.query(Alias)
+            .filter(Alias.user_id == current_user.id, Alias.delete_on != None)  # noqa: E711
+            .count()
+        )
 
     return render_template(
         "dashboard/alias_trash.html",
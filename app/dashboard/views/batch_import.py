@@ -1,3 +1,5 @@
+import secrets
+
 import arrow
 from flask import render_template, flash, request, redirect, url_for
 from flask_login import login_required, current_user
@@ -10,7 +12,9 @@ from app.db import Session
 from app.extensions import limiter
 from app.log import LOG
 from app.models import File, BatchImport, Job
-from app.utils import random_string, CSRFValidationForm
+from app.utils import CSRFValidationForm
+
+_MAX_PENDING_IMPORTS = 10
 
 
 @dashboard_bp.route("/batch_import", methods=["GET", "POST"])
@@ -18,6 +22,12 @@ from app.utils import random_string, CSRFValidationForm
 @sudo_required
 @limiter.limit("10/minute", methods=["POST"])
 def batch_import_route():
+    csrf_form = CSRFValidationForm()
+    # reject forged requests before touching the database
+    if request.method == "POST" and not csrf_form.validate():
+        flash("Invalid request", "warning")
+        return redirect(request.url)
+
     # only for users who have custom domains
     if not current_user.verified_custom_domains():
         flash("Alias batch import is only available for custom domains", "warning")
@@ -29,17 +39,18 @@ def batch_import_route():
         )
         return redirect(url_for("dashboard.index"))
 
-    batch_imports = BatchImport.filter_by(
-        user_id=current_user.id, processed=False
-    ).all()
-
-    csrf_form = CSRFValidationForm()
+    # only load one more than the limit, enough to know if the user is over it
+    batch_imports = (
+        BatchImport.filter_by(user_id=current_user.id, processed=False)
+        .order_by(BatchImport.id.desc())
+        .limit(_MAX_PENDING_IMPORTS + 1)
+        .all()
+    )
+    over_limit = len(batch_imports) > _MAX_PENDING_IMPORTS
+    batch_imports = batch_imports[:_MAX_PENDING_IMPORTS]
 
     if request.method == "POST":
-        if not csrf_form.validate():
-            flash("Invalid request", "warning")
-            return redirect(request.url)
-        if len(batch_imports) > 10:
+        if over_limit:
             flash(
                 "You have too many imports already. Please wait until some get cleaned up",
                 "error",
@@ -52,7 +63,7 @@ def batch_import_route():
 
         alias_file = request.files["alias-file"]
 
-        file_path = random_string(20) + ".csv"
+        file_path = secrets.token_urlsafe(15) + ".csv"
         file = File.create(user_id=current_user.id, path=file_path)
         s3.upload_from_bytesio(file_path, alias_file)
         Session.flush()
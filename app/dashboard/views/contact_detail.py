@@ -9,7 +9,7 @@ from app.alias_audit_log_utils import emit_alias_audit_log, AliasAuditLogAction
 from app.dashboard.base import dashboard_bp
 from app.db import Session
 from app.models import Contact
-from app.pgp_utils import PGPException, load_public_key_and_check, create_pgp_context
+from app.pgp_utils import PGPException, check_public_key
 
 
 class PGPContactForm(FlaskForm):
@@ -47,8 +47,8 @@ def contact_detail_route(contact_id):
                 else:
                     contact.pgp_public_key = pgp_form.pgp.data
                     try:
-                        contact.pgp_finger_print = load_public_key_and_check(
-                            contact.pgp_public_key, create_pgp_context()
+                        contact.pgp_finger_print = check_public_key(
+                            contact.pgp_public_key
                         )
                     except PGPException:
                         flash("Cannot add the public key, please verify it", "error")
@@ -1,6 +1,9 @@
+from typing import Dict
+
 from email_validator import validate_email, EmailNotValidError
 from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
+from sqlalchemy import literal
 from sqlalchemy.exc import IntegrityError
 
 from app import parallel_limiter
@@ -17,16 +20,37 @@ from app.dashboard.base import dashboard_bp
 from app.db import Session
 from app.extensions import limiter
 from app.log import LOG
+from app.mailbox_utils import get_verified_mailboxes_by_ids
 from app.models import (
     Alias,
     DeletedAlias,
-    Mailbox,
     AliasMailbox,
     DomainDeletedAlias,
+    CustomDomain,
 )
 from app.utils import CSRFValidationForm
 
 
+def _find_existing_email(full_alias: str) -> Dict[str, int]:
+    """Check in a single query whether the email is already used by an alias,
+    a domain deleted alias or a deleted alias.
+    Return a dict with the matching tables: alias -> user_id, domain_deleted_alias -> domain_id
+    and deleted_alias -> id"""
+    query = (
+        Session.query(literal("alias"), Alias.user_id)
+        .filter(Alias.email == full_alias)
+        .union_all(
+            Session.query(
+                literal("domain_deleted_alias"), DomainDeletedAlias.domain_id
+            ).filter(DomainDeletedAlias.email == full_alias),
+            Session.query(literal("deleted_alias"), DeletedAlias.id).filter(
+                DeletedAlias.email == full_alias
+            ),
+        )
+    )
+    return {table: value for table, value in query.all()}
+
+
 @dashboard_bp.route("/custom_alias", methods=["GET", "POST"])
 @limiter.limit(ALIAS_LIMIT, methods=["POST"])
 @login_required
@@ -41,13 +65,14 @@ def custom_alias():
         )
         return redirect(url_for("dashboard.index"))
 
-    user_custom_domains = [cd.domain for cd in current_user.verified_custom_domains()]
-    alias_suffixes = get_alias_suffixes(current_user)
-    at_least_a_premium_domain = False
-    for alias_suffix in alias_suffixes:
-        if not alias_suffix.is_custom and alias_suffix.is_premium:
-            at_least_a_premium_domain = True
-            break
+    # loaded once and reused to build and verify the suffixes
+    custom_domains = current_user.verified_custom_domains()
+    user_custom_domains = [cd.domain for cd in custom_domains]
+    alias_suffixes = get_alias_suffixes(current_user, custom_domains=custom_domains)
+    at_least_a_premium_domain = any(
+        not alias_suffix.is_custom and alias_suffix.is_premium
+        for alias_suffix in alias_suffixes
+    )
 
     csrf_form = CSRFValidationForm()
     mailboxes = [mb for mb in current_user.mailboxes() if not mb.is_admin_disabled()]
@@ -70,23 +95,16 @@ def custom_alias():
             return redirect(request.url)
 
         # check if mailbox is not tempered with
-        mailboxes = []
-        for mailbox_id in mailbox_ids:
-            mailbox = Mailbox.get(mailbox_id)
-            if (
-                not mailbox
-                or mailbox.user_id != current_user.id
-                or not mailbox.verified
-            ):
-                flash("Something went wrong, please retry", "warning")
-                return redirect(request.url)
-            if mailbox.is_admin_disabled():
-                flash(
-                    "Cannot assign admin-disabled mailbox to alias. Please contact support.",
-                    "error",
-                )
-                return redirect(request.url)
-            mailboxes.append(mailbox)
+        mailboxes = get_verified_mailboxes_by_ids(current_user, mailbox_ids)
+        if mailboxes is None:
+            flash("Something went wrong, please retry", "warning")
+            return redirect(request.url)
+        if any(mailbox.is_admin_disabled() for mailbox in mailboxes):
+            flash(
+                "Cannot assign admin-disabled mailbox to alias. Please contact support.",
+                "error",
+            )
+            return redirect(request.url)
 
         if not mailboxes:
             flash("At least one mailbox must be selected", "error")
@@ -103,7 +121,9 @@ def custom_alias():
             flash("Unknown error, refresh the page", "error")
             return redirect(request.url)
 
-        if verify_prefix_suffix(current_user, alias_prefix, suffix):
+        if verify_prefix_suffix(
+            current_user, alias_prefix, suffix, custom_domains=custom_domains
+        ):
             full_alias = alias_prefix + suffix
 
             if ".." in full_alias:
@@ -120,24 +140,21 @@ def custom_alias():
 
             general_error_msg = f"{full_alias} cannot be used"
 
-            if Alias.get_by(email=full_alias):
-                alias = Alias.get_by(email=full_alias)
-                if alias.user_id == current_user.id:
+            existing = _find_existing_email(full_alias)
+            if "alias" in existing:
+                if existing["alias"] == current_user.id:
                     flash(f"You already have this alias {full_alias}", "error")
                 else:
                     flash(general_error_msg, "error")
-            elif DomainDeletedAlias.get_by(email=full_alias):
-                domain_deleted_alias: DomainDeletedAlias = DomainDeletedAlias.get_by(
-                    email=full_alias
-                )
-                custom_domain = domain_deleted_alias.domain
+            elif "domain_deleted_alias" in existing:
+                custom_domain = CustomDomain.get(existing["domain_deleted_alias"])
                 flash(
                     f"You have deleted this alias before. If you want to re-create it, please delete it from "
                     f"{custom_domain.domain} 'Deleted Alias' page",
                     "error",
                 )
 
-            elif DeletedAlias.get_by(email=full_alias):
+            elif "deleted_alias" in existing:
                 flash(general_error_msg, "error")
 
             else:
@@ -155,11 +172,14 @@ def custom_alias():
                     flash("Unknown error, please retry", "error")
                     return redirect(url_for("dashboard.custom_alias"))
 
-                for i in range(1, len(mailboxes)):
-                    AliasMailbox.create(
-                        alias_id=alias.id,
-                        mailbox_id=mailboxes[i].id,
-                    )
+                # the first mailbox is the alias main one, the others are inserted at once
+                Session.bulk_insert_mappings(
+                    AliasMailbox,
+                    [
+                        {"alias_id": alias.id, "mailbox_id": mailbox.id}
+                        for mailbox in mailboxes[1:]
+                    ],
+                )
 
                 Session.commit()
                 LOG.i(
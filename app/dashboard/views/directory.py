@@ -3,6 +3,8 @@ from typing import Optional
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from wtforms import (
     StringField,
     validators,
@@ -21,9 +23,21 @@ from app.config import (
 from app.dashboard.base import dashboard_bp
 from app.db import Session
 from app.errors import DirectoryInTrashError
-from app.models import Directory, Mailbox, DirectoryMailbox
+from app.mailbox_utils import get_verified_mailboxes_by_ids
+from app.models import Directory, DirectoryMailbox
 from app.user_audit_log_utils import emit_user_audit_log, UserAuditLogAction
 
+_RESERVED_DIRECTORY_NAMES = frozenset(
+    {
+        "reply",
+        "ra",
+        "bounces",
+        "bounce",
+        "transactional",
+        BOUNCE_PREFIX_FOR_REPLY_PHASE,
+    }
+)
+
 
 class NewDirForm(FlaskForm):
     name = StringField(
@@ -58,6 +72,7 @@ class DeleteDirForm(FlaskForm):
 def directory():
     dirs = (
         Directory.filter_by(user_id=current_user.id)
+        .options(selectinload(Directory._mailboxes))
         .order_by(Directory.created_at.desc())
         .all()
     )
@@ -67,9 +82,6 @@ def directory():
     new_dir_form = NewDirForm()
     toggle_dir_form = ToggleDirForm()
     update_dir_form = UpdateDirForm()
-    update_dir_form.mailbox_ids.choices = [
-        (str(mailbox.id), str(mailbox.id)) for mailbox in mailboxes
-    ]
     delete_dir_form = DeleteDirForm()
 
     if request.method == "POST":
@@ -140,17 +152,10 @@ def directory():
 
             mailbox_ids = update_dir_form.mailbox_ids.data
             # check if mailbox is not tempered with
-            mailboxes = []
-            for mailbox_id in mailbox_ids:
-                mailbox = Mailbox.get(mailbox_id)
-                if (
-                    not mailbox
-                    or mailbox.user_id != current_user.id
-                    or not mailbox.verified
-                ):
-                    flash("Something went wrong, please retry", "warning")
-                    return redirect(url_for("dashboard.directory"))
-                mailboxes.append(mailbox)
+            mailboxes = get_verified_mailboxes_by_ids(current_user, mailbox_ids)
+            if mailboxes is None:
+                flash("Something went wrong, please retry", "warning")
+                return redirect(url_for("dashboard.directory"))
 
             if not mailboxes:
                 flash("You must select at least 1 mailbox", "warning")
@@ -160,8 +165,13 @@ def directory():
             DirectoryMailbox.filter_by(directory_id=dir_obj.id).delete()
             Session.flush()
 
-            for mailbox in mailboxes:
-                DirectoryMailbox.create(directory_id=dir_obj.id, mailbox_id=mailbox.id)
+            Session.bulk_insert_mappings(
+                DirectoryMailbox,
+                [
+                    {"directory_id": dir_obj.id, "mailbox_id": mailbox.id}
+                    for mailbox in mailboxes
+                ],
+            )
 
             mailboxes_as_str = ",".join(map(str, mailbox_ids))
             emit_user_audit_log(
@@ -188,64 +198,57 @@ def directory():
             if new_dir_form.validate():
                 new_dir_name = new_dir_form.name.data.lower().strip()
 
-                if Directory.get_by(name=new_dir_name):
-                    flash(f"{new_dir_name} already used", "warning")
-                elif new_dir_name in (
-                    "reply",
-                    "ra",
-                    "bounces",
-                    "bounce",
-                    "transactional",
-                    BOUNCE_PREFIX_FOR_REPLY_PHASE,
-                ):
+                # reserved names are checked first as it doesn't need a query
+                if new_dir_name in _RESERVED_DIRECTORY_NAMES:
                     flash(
                         "this directory name is reserved, please choose another name",
                         "warning",
                     )
                 else:
                     try:
-                        new_dir = Directory.create(
-                            name=new_dir_name, user_id=current_user.id
-                        )
-                        emit_user_audit_log(
-                            user=current_user,
-                            action=UserAuditLogAction.CreateDirectory,
-                            message=f"New directory {new_dir.name} ({new_dir.name})",
-                        )
+                        # name uniqueness is enforced by the unique constraint,
+                        # in a savepoint so a conflict only rolls back this insert
+                        with Session.begin_nested():
+                            new_dir = Directory.create(
+                                name=new_dir_name, user_id=current_user.id
+                            )
                     except DirectoryInTrashError:
                         flash(
                             f"{new_dir_name} has been used before and cannot be reused",
                             "error",
                         )
+                    except IntegrityError:
+                        flash(f"{new_dir_name} already used", "warning")
                     else:
+                        emit_user_audit_log(
+                            user=current_user,
+                            action=UserAuditLogAction.CreateDirectory,
+                            message=f"New directory {new_dir.name} ({new_dir.name})",
+                        )
                         Session.commit()
                         mailbox_ids = request.form.getlist("mailbox_ids")
                         if mailbox_ids:
                             # check if mailbox is not tempered with
-                            mailboxes = []
-                            for mailbox_id in mailbox_ids:
-                                mailbox = Mailbox.get(mailbox_id)
-                                if (
-                                    not mailbox
-                                    or mailbox.user_id != current_user.id
-                                    or not mailbox.verified
-                                ):
-                                    flash(
-                                        "Something went wrong, please retry", "warning"
-                                    )
-                                    return redirect(url_for("dashboard.directory"))
-                                if mailbox.is_admin_disabled():
-                                    flash(
-                                        "Cannot assign admin-disabled mailbox. Please contact support.",
-                                        "error",
-                                    )
-                                    return redirect(url_for("dashboard.directory"))
-                                mailboxes.append(mailbox)
-
-                            for mailbox in mailboxes:
-                                DirectoryMailbox.create(
-                                    directory_id=new_dir.id, mailbox_id=mailbox.id
+                            mailboxes = get_verified_mailboxes_by_ids(
+                                current_user, mailbox_ids
+                            )
+                            if mailboxes is None:
+                                flash("Something went wrong, please retry", "warning")
+                                return redirect(url_for("dashboard.directory"))
+                            if any(mb.is_admin_disabled() for mb in mailboxes):
+                                flash(
+                                    "Cannot assign admin-disabled mailbox. Please contact support.",
+                                    "error",
                                 )
+                                return redirect(url_for("dashboard.directory"))
+
+                            Session.bulk_insert_mappings(
+                                DirectoryMailbox,
+                                [
+                                    {"directory_id": new_dir.id, "mailbox_id": mb.id}
+                                    for mb in mailboxes
+                                ],
+                            )
 
                             Session.commit()
 
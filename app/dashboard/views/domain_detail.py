@@ -3,7 +3,10 @@ import re
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from flask_wtf import FlaskForm
-from wtforms import StringField, validators, IntegerField
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from wtforms import StringField, validators, IntegerField, ValidationError
 
 from app import config
 from app.constants import DMARC_RECORD
@@ -11,11 +14,12 @@ from app.custom_domain_utils import delete_custom_domain, set_custom_domain_mail
 from app.custom_domain_validation import CustomDomainValidation
 from app.dashboard.base import dashboard_bp
 from app.db import Session
+from app.extensions import limiter
+from app.mailbox_utils import get_verified_mailboxes_by_ids
 from app.models import (
     CustomDomain,
     Alias,
     DomainDeletedAlias,
-    Mailbox,
     AutoCreateRule,
     AutoCreateRuleMailbox,
 )
@@ -23,9 +27,13 @@ from app.regex_utils import regex_match
 from app.user_audit_log_utils import emit_user_audit_log, UserAuditLogAction
 from app.utils import random_string, CSRFValidationForm
 
+# the name ends up in the From header of the forwarded emails
+_ALIAS_NAME_STRIP = str.maketrans("", "", "\n\r\t\x00")
+
 
 @dashboard_bp.route("/domains/<int:custom_domain_id>/dns", methods=["GET", "POST"])
 @login_required
+@limiter.limit("20/minute", methods=["POST"])
 def domain_detail_dns(custom_domain_id):
     custom_domain: CustomDomain = CustomDomain.get(custom_domain_id)
     if not custom_domain or custom_domain.user_id != current_user.id:
@@ -51,7 +59,8 @@ def domain_detail_dns(custom_domain_id):
         if not csrf_form.validate():
             flash("Invalid request", "warning")
             return redirect(request.url)
-        if request.form.get("form-name") == "check-ownership":
+        form_name = request.form.get("form-name")
+        if form_name == "check-ownership":
             ownership_validation_result = domain_validator.validate_domain_ownership(
                 custom_domain
             )
@@ -72,7 +81,7 @@ def domain_detail_dns(custom_domain_id):
                 ownership_ok = False
                 ownership_errors = ownership_validation_result.errors
 
-        elif request.form.get("form-name") == "check-mx":
+        elif form_name == "check-mx":
             mx_validation_result = domain_validator.validate_mx_records(custom_domain)
             if mx_validation_result.success:
                 flash(
@@ -89,7 +98,7 @@ def domain_detail_dns(custom_domain_id):
                 mx_ok = False
                 mx_errors = mx_validation_result.errors
 
-        elif request.form.get("form-name") == "check-spf":
+        elif form_name == "check-spf":
             spf_validation_result = domain_validator.validate_spf_records(custom_domain)
             if spf_validation_result.success:
                 flash("SPF is setup correctly", "success")
@@ -106,7 +115,7 @@ def domain_detail_dns(custom_domain_id):
                 spf_ok = False
                 spf_errors = spf_validation_result.errors
 
-        elif request.form.get("form-name") == "check-dkim":
+        elif form_name == "check-dkim":
             dkim_errors = domain_validator.validate_dkim_records(custom_domain)
             if len(dkim_errors) == 0:
                 flash("DKIM is setup correctly.", "success")
@@ -119,7 +128,7 @@ def domain_detail_dns(custom_domain_id):
                 dkim_ok = False
                 flash("DKIM: the CNAME record is not correctly set", "warning")
 
-        elif request.form.get("form-name") == "check-dmarc":
+        elif form_name == "check-dmarc":
             dmarc_validation_result = domain_validator.validate_dmarc_records(
                 custom_domain
             )
@@ -138,6 +147,34 @@ def domain_detail_dns(custom_domain_id):
                 dmarc_ok = False
                 dmarc_errors = dmarc_validation_result.errors
 
+        elif form_name == "check-all":
+            results = domain_validator.validate_all_records(custom_domain)
+            if "ownership" in results and not results["ownership"].success:
+                ownership_ok = False
+                ownership_errors = results["ownership"].errors
+            if not results["mx"].success:
+                mx_ok = False
+                mx_errors = results["mx"].errors
+            if not results["spf"].success:
+                spf_ok = False
+                spf_errors = results["spf"].errors
+            dkim_errors = results["dkim"]
+            if len(dkim_errors) > 0:
+                dkim_ok = False
+            if not results["dmarc"].success:
+                dmarc_ok = False
+                dmarc_errors = results["dmarc"].errors
+
+            if ownership_ok and mx_ok and spf_ok and dkim_ok and dmarc_ok:
+                flash("All DNS records are setup correctly", "success")
+                return redirect(
+                    url_for(
+                        "dashboard.domain_detail_dns", custom_domain_id=custom_domain.id
+                    )
+                )
+            else:
+                flash("Some DNS records are not correctly set", "warning")
+
     return render_template(
         "dashboard/domain_detail/dns.html",
         EMAIL_SERVERS_WITH_PRIORITY=config.EMAIL_SERVERS_WITH_PRIORITY,
@@ -167,7 +204,8 @@ def domain_detail(custom_domain_id):
         if not csrf_form.validate():
             flash("Invalid request", "warning")
             return redirect(request.url)
-        if request.form.get("form-name") == "switch-catch-all":
+        form_name = request.form.get("form-name")
+        if form_name == "switch-catch-all":
             custom_domain.catch_all = not custom_domain.catch_all
             emit_user_audit_log(
                 user=current_user,
@@ -189,9 +227,11 @@ def domain_detail(custom_domain_id):
             return redirect(
                 url_for("dashboard.domain_detail", custom_domain_id=custom_domain.id)
             )
-        elif request.form.get("form-name") == "set-name":
+        elif form_name == "set-name":
             if request.form.get("action") == "save":
-                custom_domain.name = request.form.get("alias-name").replace("\n", "")
+                custom_domain.name = request.form.get("alias-name").translate(
+                    _ALIAS_NAME_STRIP
+                )
                 emit_user_audit_log(
                     user=current_user,
                     action=UserAuditLogAction.UpdateCustomDomain,
@@ -218,7 +258,7 @@ def domain_detail(custom_domain_id):
             return redirect(
                 url_for("dashboard.domain_detail", custom_domain_id=custom_domain.id)
             )
-        elif request.form.get("form-name") == "switch-random-prefix-generation":
+        elif form_name == "switch-random-prefix-generation":
             custom_domain.random_prefix_generation = (
                 not custom_domain.random_prefix_generation
             )
@@ -242,7 +282,7 @@ def domain_detail(custom_domain_id):
             return redirect(
                 url_for("dashboard.domain_detail", custom_domain_id=custom_domain.id)
             )
-        elif request.form.get("form-name") == "update":
+        elif form_name == "update":
             mailbox_ids = request.form.getlist("mailbox_ids")
             result = set_custom_domain_mailboxes(
                 user_id=current_user.id,
@@ -259,7 +299,7 @@ def domain_detail(custom_domain_id):
                 url_for("dashboard.domain_detail", custom_domain_id=custom_domain.id)
             )
 
-        elif request.form.get("form-name") == "delete":
+        elif form_name == "delete":
             name = custom_domain.domain
 
             delete_custom_domain(custom_domain)
@@ -293,8 +333,11 @@ def domain_detail_trash(custom_domain_id):
         if not csrf_form.validate():
             flash("Invalid request", "warning")
             return redirect(request.url)
-        if request.form.get("form-name") == "empty-all":
-            DomainDeletedAlias.filter_by(domain_id=custom_domain.id).delete()
+        form_name = request.form.get("form-name")
+        if form_name == "empty-all":
+            DomainDeletedAlias.filter_by(domain_id=custom_domain.id).delete(
+                synchronize_session=False
+            )
             Session.commit()
 
             flash("All deleted aliases can now be re-created", "success")
@@ -303,7 +346,7 @@ def domain_detail_trash(custom_domain_id):
                     "dashboard.domain_detail_trash", custom_domain_id=custom_domain.id
                 )
             )
-        elif request.form.get("form-name") == "remove-single":
+        elif form_name == "remove-single":
             deleted_alias_id = request.form.get("deleted-alias-id")
             deleted_alias = DomainDeletedAlias.get(deleted_alias_id)
             if not deleted_alias or deleted_alias.domain_id != custom_domain.id:
@@ -340,9 +383,21 @@ def domain_detail_trash(custom_domain_id):
     )
 
 
+def regex_validator(form, field):
+    try:
+        re.compile(field.data)
+    except Exception:
+        raise ValidationError(f"Invalid regex {field.data}")
+
+
 class AutoCreateRuleForm(FlaskForm):
     regex = StringField(
-        "regex", validators=[validators.DataRequired(), validators.Length(max=128)]
+        "regex",
+        validators=[
+            validators.DataRequired(),
+            validators.Length(max=128),
+            regex_validator,
+        ],
     )
 
     display_name = StringField(
@@ -366,7 +421,15 @@ class AutoCreateTestForm(FlaskForm):
 )
 @login_required
 def domain_detail_auto_create(custom_domain_id):
-    custom_domain: CustomDomain = CustomDomain.get(custom_domain_id)
+    custom_domain: CustomDomain = (
+        CustomDomain.filter_by(id=custom_domain_id)
+        .options(
+            selectinload(CustomDomain._auto_create_rules).selectinload(
+                AutoCreateRule.mailboxes
+            )
+        )
+        .first()
+    )
     mailboxes = [mb for mb in current_user.mailboxes() if not mb.is_admin_disabled()]
     new_auto_create_rule_form = AutoCreateRuleForm()
 
@@ -382,107 +445,97 @@ def domain_detail_auto_create(custom_domain_id):
         return redirect(url_for("dashboard.index"))
 
     if request.method == "POST":
-        if request.form.get("form-name") == "create-auto-create-rule":
+        form_name = request.form.get("form-name")
+        if form_name == "create-auto-create-rule":
             if new_auto_create_rule_form.validate():
-                # make sure order isn't used before
-                for auto_create_rule in custom_domain.auto_create_rules:
-                    auto_create_rule: AutoCreateRule
-                    if auto_create_rule.order == int(
-                        new_auto_create_rule_form.order.data
-                    ):
-                        flash(
-                            "Another rule with the same order already exists", "error"
-                        )
-                        break
-                else:
-                    mailbox_ids = request.form.getlist("mailbox_ids")
-                    # check if mailbox is not tempered with
-                    mailboxes = []
-                    for mailbox_id in mailbox_ids:
-                        mailbox = Mailbox.get(mailbox_id)
-                        if (
-                            not mailbox
-                            or mailbox.user_id != current_user.id
-                            or not mailbox.verified
-                        ):
-                            flash("Something went wrong, please retry", "warning")
-                            return redirect(
-                                url_for(
-                                    "dashboard.domain_detail_auto_create",
-                                    custom_domain_id=custom_domain.id,
-                                )
-                            )
-                        if mailbox.is_admin_disabled():
-                            flash(
-                                "Cannot assign admin-disabled mailbox. Please contact support.",
-                                "error",
-                            )
-                            return redirect(
-                                url_for(
-                                    "dashboard.domain_detail_auto_create",
-                                    custom_domain_id=custom_domain.id,
-                                )
-                            )
-                        mailboxes.append(mailbox)
-
-                    if not mailboxes:
-                        flash("You must select at least 1 mailbox", "warning")
-                        return redirect(
-                            url_for(
-                                "dashboard.domain_detail_auto_create",
-                                custom_domain_id=custom_domain.id,
-                            )
-                        )
-
-                    try:
-                        re.compile(new_auto_create_rule_form.regex.data)
-                    except Exception:
-                        flash(
-                            f"Invalid regex {new_auto_create_rule_form.regex.data}",
-                            "error",
+                mailbox_ids = request.form.getlist("mailbox_ids")
+                # check if mailbox is not tempered with
+                mailboxes = get_verified_mailboxes_by_ids(current_user, mailbox_ids)
+                if mailboxes is None:
+                    flash("Something went wrong, please retry", "warning")
+                    return redirect(
+                        url_for(
+                            "dashboard.domain_detail_auto_create",
+                            custom_domain_id=custom_domain.id,
                         )
-                        return redirect(
-                            url_for(
-                                "dashboard.domain_detail_auto_create",
-                                custom_domain_id=custom_domain.id,
-                            )
+                    )
+                if any(mb.is_admin_disabled() for mb in mailboxes):
+                    flash(
+                        "Cannot assign admin-disabled mailbox. Please contact support.",
+                        "error",
+                    )
+                    return redirect(
+                        url_for(
+                            "dashboard.domain_detail_auto_create",
+                            custom_domain_id=custom_domain.id,
                         )
+                    )
 
-                    display_name = None
-                    if new_auto_create_rule_form.display_name.data:
-                        raw_display = new_auto_create_rule_form.display_name.data
-                        display_name = (
-                            raw_display.replace("\r", " ").replace("\n", " ").strip()
+                if not mailboxes:
+                    flash("You must select at least 1 mailbox", "warning")
+                    return redirect(
+                        url_for(
+                            "dashboard.domain_detail_auto_create",
+                            custom_domain_id=custom_domain.id,
                         )
+                    )
 
-                    rule = AutoCreateRule.create(
-                        custom_domain_id=custom_domain.id,
-                        order=int(new_auto_create_rule_form.order.data),
-                        regex=new_auto_create_rule_form.regex.data,
-                        display_name=display_name or None,
-                        flush=True,
+                display_name = None
+                if new_auto_create_rule_form.display_name.data:
+                    raw_display = new_auto_create_rule_form.display_name.data
+                    display_name = (
+                        raw_display.replace("\r", " ").replace("\n", " ").strip()
                     )
 
-                    for mailbox in mailboxes:
-                        AutoCreateRuleMailbox.create(
-                            auto_create_rule_id=rule.id, mailbox_id=mailbox.id
+                # the order uniqueness is enforced by uq_auto_create_rule_order
+                # in a savepoint so a conflict only rolls back this insert
+                try:
+                    with Session.begin_nested():
+                        rule = AutoCreateRule.create(
+                            custom_domain_id=custom_domain.id,
+                            order=int(new_auto_create_rule_form.order.data),
+                            regex=new_auto_create_rule_form.regex.data,
+                            display_name=display_name or None,
+                            flush=True,
                         )
-
-                    Session.commit()
-
-                    flash("New auto create rule has been created", "success")
-
+                except IntegrityError:
+                    flash("Another rule with the same order already exists", "error")
                     return redirect(
                         url_for(
                             "dashboard.domain_detail_auto_create",
                             custom_domain_id=custom_domain.id,
                         )
                     )
-        elif request.form.get("form-name") == "delete-auto-create-rule":
-            rule_id = request.form.get("rule-id")
-            rule: AutoCreateRule = AutoCreateRule.get(int(rule_id))
 
-            if not rule or rule.custom_domain_id != custom_domain.id:
+                Session.bulk_insert_mappings(
+                    AutoCreateRuleMailbox,
+                    [
+                        {"auto_create_rule_id": rule.id, "mailbox_id": mailbox.id}
+                        for mailbox in mailboxes
+                    ],
+                )
+
+                Session.commit()
+
+                flash("New auto create rule has been created", "success")
+
+                return redirect(
+                    url_for(
+                        "dashboard.domain_detail_auto_create",
+                        custom_domain_id=custom_domain.id,
+                    )
+                )
+        elif form_name == "delete-auto-create-rule":
+            rule_id = request.form.get("rule-id")
+            # the ownership check is part of the DELETE, no need to load the rule first
+            rule_order = Session.execute(
+                delete(AutoCreateRule)
+                .where(AutoCreateRule.id == int(rule_id))
+                .where(AutoCreateRule.custom_domain_id == custom_domain.id)
+                .returning(AutoCreateRule.order)
+            ).scalar()
+
+            if rule_order is None:
                 flash("Something wrong, please retry", "error")
                 return redirect(
                     url_for(
@@ -491,8 +544,6 @@ def domain_detail_auto_create(custom_domain_id):
                     )
                 )
 
-            rule_order = rule.order
-            AutoCreateRule.delete(rule_id)
             Session.commit()
             flash(f"Rule #{rule_order} has been deleted", "success")
             return redirect(
@@ -501,7 +552,7 @@ def domain_detail_auto_create(custom_domain_id):
                     custom_domain_id=custom_domain.id,
                 )
             )
-        elif request.form.get("form-name") == "test-auto-create-rule":
+        elif form_name == "test-auto-create-rule":
             if auto_create_test_form.validate():
                 local = auto_create_test_form.local.data
                 auto_create_test_local = local
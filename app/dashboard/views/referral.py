@@ -1,21 +1,35 @@
 import re2 as re
 from flask import render_template, request, flash, redirect, url_for
 from flask_login import login_required, current_user
+from flask_wtf import FlaskForm
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from wtforms import StringField, validators
 
 from app.dashboard.base import dashboard_bp
 from app.db import Session
-from app.models import Referral, Payout
+from app.models import Referral, Payout, User
 
-_REFERRAL_PATTERN = r"[0-9a-z-_]{3,}"
+# re2 $ only matches at the very end, a trailing newline is rejected
+_REFERRAL_PATTERN = re.compile(r"^[0-9a-z-_]{3,}$")
+
+
+class NewReferralForm(FlaskForm):
+    code = StringField(
+        "code",
+        validators=[validators.DataRequired(), validators.Regexp(_REFERRAL_PATTERN)],
+    )
+    name = StringField("name")
 
 
 @dashboard_bp.route("/referral", methods=["GET", "POST"])
 @login_required
 def referral_route():
+    new_referral_form = NewReferralForm()
+
     if request.method == "POST":
         if request.form.get("form-name") == "create":
-            code = request.form.get("code")
-            if re.fullmatch(_REFERRAL_PATTERN, code) is None:
+            if not new_referral_form.validate():
                 flash(
                     "At least 3 characters. Only lowercase letters, "
                     "numbers, dashes (-) and underscores (_) are currently supported.",
@@ -23,12 +37,19 @@ def referral_route():
                 )
                 return redirect(url_for("dashboard.referral_route"))
 
-            if Referral.get_by(code=code):
+            try:
+                # code uniqueness is enforced by the unique constraint,
+                # in a savepoint so a conflict only rolls back this insert
+                with Session.begin_nested():
+                    referral = Referral.create(
+                        user_id=current_user.id,
+                        code=new_referral_form.code.data,
+                        name=new_referral_form.name.data,
+                        flush=True,
+                    )
+            except IntegrityError:
                 flash("Code already used", "error")
                 return redirect(url_for("dashboard.referral_route"))
-
-            name = request.form.get("name")
-            referral = Referral.create(user_id=current_user.id, code=code, name=name)
             Session.commit()
             flash("A new referral code has been created", "success")
             return redirect(
@@ -59,16 +80,29 @@ def referral_route():
         highlight_id = int(highlight_id)
 
     referrals = Referral.filter_by(user_id=current_user.id).all()
-    # make sure the highlighted referral is the first referral
-    highlight_index = None
-    for ix, referral in enumerate(referrals):
-        if referral.id == highlight_id:
-            highlight_index = ix
-            break
+    # make sure the highlighted referral is the first referral, the sort is stable
+    # so the other referrals keep their order
+    if highlight_id:
+        referrals.sort(key=lambda r: r.id != highlight_id)
 
-    if highlight_index:
-        referrals.insert(0, referrals.pop(highlight_index))
+    # count the referred users of all referrals at once instead of one query per referral
+    nb_users_by_referral = dict(
+        Session.query(User.referral_id, func.count(User.id))
+        .filter(
+            User.referral_id.in_([referral.id for referral in referrals]),
+            User.activated.is_(True),
+        )
+        .group_by(User.referral_id)
+        .all()
+    )
 
     payouts = Payout.filter_by(user_id=current_user.id).all()
 
-    return render_template("dashboard/referral.html", **locals())
+    return render_template(
+        "dashboard/referral.html",
+        referrals=referrals,
+        highlight_id=highlight_id,
+        nb_users_by_referral=nb_users_by_referral,
+        payouts=payouts,
+        new_referral_form=new_referral_form,
+    )
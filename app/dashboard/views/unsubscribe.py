@@ -84,18 +84,19 @@ def encoded_unsubscribe(encoded_request: str):
     if not unsub_data:
         flash("Invalid unsubscribe request", "error")
         return redirect(url_for("dashboard.index"))
+    # the handler already loaded the alias/contact, no need to query them again
     if unsub_data.action == UnsubscribeAction.DisableAlias:
-        alias = Alias.get(unsub_data.data)
-        flash(f"Alias {alias.email} has been blocked", "success")
-        return redirect(url_for("dashboard.index", highlight_alias_id=alias.id))
+        flash(f"Alias {unsub_data.display_email} has been blocked", "success")
+        return redirect(
+            url_for("dashboard.index", highlight_alias_id=unsub_data.alias_id)
+        )
     if unsub_data.action == UnsubscribeAction.DisableContact:
-        contact = Contact.get(unsub_data.data)
-        flash(f"Emails sent from {contact.website_email} are now blocked", "success")
+        flash(f"Emails sent from {unsub_data.display_email} are now blocked", "success")
         return redirect(
             url_for(
                 "dashboard.alias_contact_manager",
-                alias_id=contact.alias_id,
-                highlight_contact_id=contact.id,
+                alias_id=unsub_data.alias_id,
+                highlight_contact_id=unsub_data.data,
             )
         )
     if unsub_data.action == UnsubscribeAction.UnsubscribeNewsletter:
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
 
 import dns.resolver
 
@@ -138,6 +139,52 @@ class InMemoryDNSClient(DNSClient):
         return self.txt_records.get(hostname, [])
 
 
+class MxPrefetchDNSClient(DNSClient):
+    """Serve MX and A records resolved in parallel beforehand by prefetch_mx(),
+    other lookups and cache misses go to the wrapped client"""
+
+    def __init__(self, dns_client: DNSClient, max_workers: int):
+        self._dns_client = dns_client
+        self._max_workers = max_workers
+        self._mx_records: dict[str, dict[int, list[str]]] = {}
+        self._a_records: dict[str, Optional[str]] = {}
+
+    def prefetch_mx(self, hostnames: Iterable[str]):
+        """Resolve the MX records of the hostnames then the A record of each MX domain"""
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            hostnames = set(hostnames) - self._mx_records.keys()
+            self._mx_records.update(
+                zip(hostnames, executor.map(self._dns_client.get_mx_domains, hostnames))
+            )
+
+            # same format as get_mx_domain_list(): without the trailing dot
+            mx_domains = {
+                mx_domain[:-1]
+                for priority_domains in self._mx_records.values()
+                for mx_domains in priority_domains.values()
+                for mx_domain in mx_domains
+            } - self._a_records.keys()
+            self._a_records.update(
+                zip(mx_domains, executor.map(self._dns_client.get_a_record, mx_domains))
+            )
+
+    def get_cname_record(self, hostname: str) -> Optional[str]:
+        return self._dns_client.get_cname_record(hostname)
+
+    def get_a_record(self, hostname: str) -> Optional[str]:
+        if hostname in self._a_records:
+            return self._a_records[hostname]
+        return self._dns_client.get_a_record(hostname)
+
+    def get_mx_domains(self, hostname: str) -> dict[int, list[str]]:
+        if hostname in self._mx_records:
+            return self._mx_records[hostname]
+        return self._dns_client.get_mx_domains(hostname)
+
+    def get_txt_record(self, hostname: str) -> List[str]:
+        return self._dns_client.get_txt_record(hostname)
+
+
 global_dns_client: Optional[DNSClient] = None
 
 
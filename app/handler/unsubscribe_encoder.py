@@ -31,6 +31,9 @@ class UnsubscribeOriginalData:
 class UnsubscribeData:
     action: UnsubscribeAction
     data: Union[UnsubscribeOriginalData, int]
+    # set by UnsubscribeHandler once the action is done, never encoded
+    display_email: Optional[str] = None
+    alias_id: Optional[int] = None
 
 
 @dataclass
@@ -55,9 +55,9 @@ class UnsubscribeHandler:
             return status.E507
 
         if unsub_data.action == UnsubscribeAction.DisableAlias:
-            return self._disable_alias(unsub_data.data, mailbox.user, mailbox)
+            return self._disable_alias(unsub_data, mailbox.user, mailbox)
         elif unsub_data.action == UnsubscribeAction.DisableContact:
-            return self._disable_contact(unsub_data.data, mailbox.user, mailbox)
+            return self._disable_contact(unsub_data, mailbox.user, mailbox)
         elif unsub_data.action == UnsubscribeAction.UnsubscribeNewsletter:
             return self._unsubscribe_user_from_newsletter(unsub_data.data, mailbox.user)
         elif unsub_data.action == UnsubscribeAction.OriginalUnsubscribeMailto:
@@ -73,9 +73,9 @@ class UnsubscribeHandler:
             LOG.w("Wrong request %s", unsub_request)
             return None
         if unsub_data.action == UnsubscribeAction.DisableAlias:
-            response_code = self._disable_alias(unsub_data.data, user)
+            response_code = self._disable_alias(unsub_data, user)
         elif unsub_data.action == UnsubscribeAction.DisableContact:
-            response_code = self._disable_contact(unsub_data.data, user)
+            response_code = self._disable_contact(unsub_data, user)
         elif unsub_data.action == UnsubscribeAction.UnsubscribeNewsletter:
             response_code = self._unsubscribe_user_from_newsletter(
                 unsub_data.data, user
@@ -89,9 +89,12 @@ class UnsubscribeHandler:
         return None
 
     def _disable_alias(
-        self, alias_id: int, user: User, mailbox: Optional[Mailbox] = None
+        self,
+        unsub_data: UnsubscribeData,
+        user: User,
+        mailbox: Optional[Mailbox] = None,
     ) -> str:
-        alias = Alias.get(alias_id)
+        alias = Alias.get(unsub_data.data)
         if not alias:
             return status.E508
         if alias.user_id != user.id:
@@ -127,12 +130,17 @@ class UnsubscribeHandler:
                         enable_alias_url=enable_alias_url,
                     ),
                 )
+        unsub_data.display_email = alias.email
+        unsub_data.alias_id = alias.id
         return status.E202
 
     def _disable_contact(
-        self, contact_id: int, user: User, mailbox: Optional[Mailbox] = None
+        self,
+        unsub_data: UnsubscribeData,
+        user: User,
+        mailbox: Optional[Mailbox] = None,
     ) -> str:
-        contact = Contact.get(contact_id)
+        contact = Contact.get(unsub_data.data)
         if not contact:
             return status.E508
         if contact.user_id != user.id:
@@ -165,6 +173,8 @@ class UnsubscribeHandler:
                         unblock_contact_url=unblock_contact_url,
                     ),
                 )
+        unsub_data.display_email = contact.website_email
+        unsub_data.alias_id = alias.id
         return status.E202
 
     def _unsubscribe_user_from_newsletter(
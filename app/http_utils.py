@@ -0,0 +1,23 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_POOL_CONNECTIONS = 10
+_POOL_MAXSIZE = 20
+
+# Shared by every outgoing session so keep-alive connections to the OAuth providers
+# (GitHub, Google, Facebook, Proton...) are reused across requests instead of paying
+# a new TCP+TLS handshake on each callback.
+# Only connection errors are retried: token exchanges are POSTs and must not be replayed.
+_pooled_adapter = HTTPAdapter(
+    pool_connections=_POOL_CONNECTIONS,
+    pool_maxsize=_POOL_MAXSIZE,
+    max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1),
+)
+
+
+def mount_pooled_adapter(session: requests.Session) -> requests.Session:
+    """Make the session use the process-wide connection pool"""
+    session.mount("https://", _pooled_adapter)
+    session.mount("http://", _pooled_adapter)
+    return session
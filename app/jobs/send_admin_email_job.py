@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import arrow
+
+from app.config import ADMIN_EMAIL
+from app.constants import JobType
+from app.email_utils import send_email
+from app.models import Job, JobPriority
+
+
+class SendAdminEmailJob:
+    """Send a notification email to the admin outside the request"""
+
+    def __init__(self, subject: str, html: str = ""):
+        self._subject: str = subject
+        self._html: str = html
+
+    def run(self) -> None:
+        send_email(ADMIN_EMAIL, subject=self._subject, plaintext="", html=self._html)
+
+    @staticmethod
+    def create_from_job(job: Job) -> Optional[SendAdminEmailJob]:
+        return SendAdminEmailJob(
+            subject=job.payload["subject"], html=job.payload.get("html", "")
+        )
+
+    def store_job_in_db(self, commit: bool = True) -> Job:
+        return Job.create(
+            name=JobType.SEND_ADMIN_EMAIL.value,
+            payload={"subject": self._subject, "html": self._html},
+            priority=JobPriority.Low,
+            run_at=arrow.now(),
+            commit=commit,
+        )
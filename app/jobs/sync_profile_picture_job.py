@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import secrets
+from typing import Optional
+
+import arrow
+
+from app import s3
+from app.constants import JobType
+from app.db import Session
+from app.log import LOG
+from app.models import User, Job, File, JobPriority
+
+
+def create_file_from_url(user: User, url: str) -> File:
+    file_path = secrets.token_urlsafe(22)
+    file = File.create(path=file_path, user_id=user.id)
+
+    s3.upload_from_url(url, file_path)
+
+    Session.flush()
+    LOG.d("upload file %s to s3", file)
+
+    return file
+
+
+class SyncProfilePictureJob:
+    """Download the profile picture given by a social login provider and set it on the user.
+    Done outside the login request as it involves downloading and uploading the picture"""
+
+    def __init__(self, user: User, picture_url: str):
+        self._user: User = user
+        self._picture_url: str = picture_url
+
+    def run(self):
+        # user might have set a picture in the meantime
+        if self._user.profile_picture_id:
+            return
+
+        LOG.d("set user %s profile picture to %s", self._user, self._picture_url)
+        file = create_file_from_url(self._user, self._picture_url)
+        self._user.profile_picture_id = file.id
+        Session.commit()
+
+    @staticmethod
+    def create_from_job(job: Job) -> Optional[SyncProfilePictureJob]:
+        user = User.get(job.payload["user_id"])
+        if not user:
+            return None
+
+        return SyncProfilePictureJob(user=user, picture_url=job.payload["picture_url"])
+
+    def store_job_in_db(
+        self,
+        run_at: Optional[arrow.Arrow] = None,
+        priority: JobPriority = JobPriority.Default,
+        commit: bool = True,
+    ) -> Job:
+        return Job.create(
+            name=JobType.SYNC_PROFILE_PICTURE.value,
+            payload={"user_id": self._user.id, "picture_url": self._picture_url},
+            priority=priority,
+            run_at=run_at if run_at is not None else arrow.now(),
+            commit=commit,
+        )
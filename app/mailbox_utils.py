@@ -4,7 +4,7 @@ import uuid
 from email.message import Message
 from enum import Enum
 from io import BytesIO
-from typing import Optional
+from typing import Optional, List
 
 import arrow
 from aiosmtpd.smtp import Envelope
@@ -546,6 +546,32 @@ def count_mailbox_aliases(mailbox: Mailbox) -> int:
     return len(alias_ids)
 
 
+def get_verified_mailboxes_by_ids(
+    user: User, mailbox_ids: List[str]
+) -> Optional[List[Mailbox]]:
+    """Load the given mailboxes in a single query, keeping the order of mailbox_ids.
+    Return None if any id is invalid or doesn't belong to a verified mailbox of the user"""
+    try:
+        ids = [int(mailbox_id) for mailbox_id in mailbox_ids]
+    except (TypeError, ValueError):
+        return None
+    if not ids:
+        return []
+
+    mailboxes_by_id = {
+        mailbox.id: mailbox
+        for mailbox in Mailbox.filter(
+            Mailbox.id.in_(ids),
+            Mailbox.user_id == user.id,
+            Mailbox.verified.is_(True),
+        ).all()
+    }
+    if len(mailboxes_by_id) != len(set(ids)):
+        return None
+
+    return [mailboxes_by_id[mailbox_id] for mailbox_id in ids]
+
+
 def admin_disable_mailbox(
     mailbox: Mailbox, admin_user: Optional[User] = None, note: Optional[str] = None
 ) -> int:
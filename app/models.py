@@ -22,6 +22,7 @@ from jinja2 import FileSystemLoader, Environment
 from newrelic import agent
 from sqlalchemy import orm, or_
 from sqlalchemy import text, desc, CheckConstraint, Index, Column
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import deferred
@@ -779,6 +780,18 @@ class User(Base, ModelMixin, UserMixin, PasswordOracle):
 
         return res
 
+    @classmethod
+    def get_by_email_or_canonical_email(
+        cls, email: str, canonical_email: str
+    ) -> Optional["User"]:
+        """Same as get_by(email=email) or get_by(email=canonical_email) in a single query.
+        The exact email is preferred if both exist"""
+        return (
+            cls.filter(cls.email.in_({email, canonical_email}))
+            .order_by(cls.email != email)
+            .first()
+        )
+
     def get_active_subscription(
         self, include_partner_subscription: bool = True
     ) -> Optional[
@@ -854,6 +867,52 @@ class User(Base, ModelMixin, UserMixin, PasswordOracle):
 
         return True
 
+    @classmethod
+    def is_paid_clause(cls):
+        """SQL counterpart of is_paid() to count or filter paid users in a single query.
+        Follows the get_active_subscription() order: an active giveaway manual subscription
+        hides the Coinbase and partner subscriptions"""
+        now = arrow.now()
+
+        def has(model, *criteria):
+            return sa.exists().where(and_(model.user_id == cls.id, *criteria))
+
+        paddle = has(
+            Subscription,
+            Subscription.next_bill_date
+            >= now.shift(days=-PADDLE_SUBSCRIPTION_GRACE_DAYS).date(),
+        )
+        apple = has(
+            AppleSubscription,
+            AppleSubscription.expires_date > now.shift(days=-_APPLE_GRACE_PERIOD_DAYS),
+        )
+        manual_active = has(ManualSubscription, ManualSubscription.end_at > now)
+        manual_paid = has(
+            ManualSubscription,
+            ManualSubscription.end_at > now,
+            ManualSubscription.is_giveaway.is_(False),
+        )
+        coinbase = has(CoinbaseSubscription, CoinbaseSubscription.end_at > now)
+        partner = (
+            sa.exists()
+            .where(PartnerSubscription.partner_user_id == PartnerUser.id)
+            .where(PartnerUser.user_id == cls.id)
+            .where(
+                or_(
+                    PartnerSubscription.lifetime.is_(True),
+                    PartnerSubscription.end_at
+                    > now.shift(days=-_PARTNER_SUBSCRIPTION_GRACE_DAYS),
+                )
+            )
+        )
+
+        return or_(
+            paddle,
+            apple,
+            manual_paid,
+            and_(~manual_active, or_(coinbase, partner)),
+        )
+
     def is_active(self) -> bool:
         if self.delete_on is None:
             return True
@@ -1311,7 +1370,7 @@ class ActivationCode(Base, ModelMixin):
 
     expired = sa.Column(ArrowType, nullable=False, default=_expiration_1h)
 
-    __table_args__ = (sa.Index("ix_activation_code_user_id", "user_id"),)
+    __table_args__ = (sa.Index("ix_activation_code_user_id", "user_id", unique=True),)
 
     def is_expired(self):
         return self.expired < arrow.now()
@@ -1347,6 +1406,20 @@ class SocialAuth(Base, ModelMixin):
 
     __table_args__ = (sa.UniqueConstraint("user_id", "social", name="uq_social_auth"),)
 
+    @classmethod
+    def record(cls, user_id: int, social: str):
+        """Remember the user has used this social login.
+        Repeated logins only need the lookup, concurrent first logins don't conflict"""
+        if cls.get_by(user_id=user_id, social=social):
+            return
+
+        Session.execute(
+            postgresql.insert(cls)
+            .values(user_id=user_id, social=social)
+            .on_conflict_do_nothing(constraint="uq_social_auth")
+        )
+        Session.commit()
+
 
 # <<< OAUTH models >>>
 
@@ -1705,6 +1778,13 @@ class Alias(Base, ModelMixin):
         ),
         Index("ix_alias_original_owner_id", "original_owner_id"),
         Index("ix_alias_delete_on", "delete_on"),
+        # trashed aliases of a user ordered by delete_on, see alias_trash
+        Index(
+            "ix_alias_user_id_delete_on",
+            "user_id",
+            "delete_on",
+            postgresql_where=text("delete_on IS NOT NULL"),
+        ),
     )
 
     user = orm.relationship(User, foreign_keys=[user_id])
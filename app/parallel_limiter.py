@@ -10,10 +10,20 @@ from werkzeug import exceptions
 
 lock_redis: Optional[RedisStorage] = None
 
+# Only delete the lock if it still holds our value, in a single atomic round trip
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+_release_lock_script = None
+
 
 def set_redis_concurrent_lock(redis: RedisStorage):
-    global lock_redis
+    global lock_redis, _release_lock_script
     lock_redis = redis
+    _release_lock_script = redis.storage.register_script(_RELEASE_LOCK_SCRIPT)
 
 
 class _InnerLock:
@@ -34,9 +44,7 @@ class _InnerLock:
             raise exceptions.TooManyRequests()
 
     def release_lock(self, lock_name: str, lock_value: str):
-        current_lock_value = lock_redis.storage.get(lock_name)
-        if current_lock_value == lock_value.encode("utf-8"):
-            lock_redis.storage.delete(lock_name)
+        _release_lock_script(keys=[lock_name], args=[lock_value])
 
     def __call__(self, f: Callable[..., Any]):
         if self.lock_suffix is None:
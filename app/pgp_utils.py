@@ -1,5 +1,6 @@
 import os
 import time
+from functools import lru_cache
 from io import BytesIO
 from typing import Union
 
@@ -111,6 +112,20 @@ def load_public_key_and_check(
             return fingerprint
 
 
+# lru_cache is thread safe and does not keep keys that failed the check
+@lru_cache(maxsize=1024)
+def _check_public_key(public_key: str, implementation: str) -> str:
+    return load_public_key_and_check(public_key, create_pgp_context())
+
+
+def check_public_key(public_key: str) -> str:
+    """Load the public key in a new context and check it can be used for encryption.
+    Keys that already passed the check in this process are not imported again.
+    Return the fingerprint
+    """
+    return _check_public_key(public_key, _get_implementation_name(False))
+
+
 def hard_exit():
     pid = os.getpid()
     LOG.w("kill pid %s", pid)
@@ -18,17 +18,19 @@ def reservation_route(reservation_id: int):
         return redirect(url_for("phone.index"))
 
     phone_number = reservation.number
+    now = arrow.now()
 
     if request.method == "POST":
         if request.form.get("form-name") == "release":
-            time_left = reservation.end - arrow.now()
-            if time_left.seconds > 0:
-                current_user.phone_quota += time_left.seconds // 60
+            # total_seconds() is negative once the reservation has ended, unlike .seconds
+            minutes_left = int((reservation.end - now).total_seconds() // 60)
+            if minutes_left > 0:
+                current_user.phone_quota += minutes_left
                 flash(
-                    f"Your phone quota is increased by {time_left.seconds // 60} minutes",
+                    f"Your phone quota is increased by {minutes_left} minutes",
                     "success",
                 )
-            reservation.end = arrow.now()
+            reservation.end = now
             Session.commit()
 
             flash(f"{phone_number.number} is released", "success")
@@ -38,5 +40,5 @@ def reservation_route(reservation_id: int):
         "phone/phone_reservation.html",
         phone_number=phone_number,
         reservation=reservation,
-        now=arrow.now(),
+        now=now,
     )
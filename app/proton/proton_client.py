@@ -8,6 +8,7 @@ from typing import Optional
 from app.account_linking import SLPlan, SLPlanType
 from app.config import PROTON_EXTRA_HEADER_NAME, PROTON_EXTRA_HEADER_VALUE
 from app.errors import ProtonAccountNotVerified
+from app.http_utils import mount_pooled_adapter
 from app.log import LOG
 
 _APP_VERSION = "Other_1.0.0"
@@ -84,7 +85,8 @@ class HttpProtonClient(ProtonClient):
     ):
         self.base_url = base_url
         self.access_token = credentials.access_token
-        client = Session()
+        # per-user headers and cookies stay on this session, the connections are pooled
+        client = mount_pooled_adapter(Session())
         client.verify = verify
         headers = {
             "x-pm-appversion": _APP_VERSION,
@@ -138,11 +140,14 @@ class HttpProtonClient(ProtonClient):
     @staticmethod
     def __validate_response(res: Response) -> dict:
         status = res.status_code
-        as_json = res.json()
         if status != HTTPStatus.OK:
-            raise Exception(
-                f"Unexpected status code. Wanted 200 and got {status}: " + res.text
-            )
+            # error pages from a proxy in front of the API (e.g. a 502) aren't JSON
+            try:
+                body = res.json()
+            except ValueError:
+                body = {}
+            raise handle_response_not_ok(status, body, res.text)
+        as_json = res.json()
         res_code = as_json.get("Code")
         if not res_code or res_code != 1000:
             raise Exception(
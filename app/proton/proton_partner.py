@@ -1,23 +1,33 @@
-from typing import Optional
+import time
+from typing import Optional, Tuple
 
-from app.db import Session
 from app.errors import ProtonPartnerNotSetUp
 from app.models import Partner
 from app.partner_utils import PartnerData
 
 PROTON_PARTNER_NAME = "Proton"
-_PROTON_PARTNER: Optional[Partner] = None
+# reload the partner from time to time so changes made to it are picked up without a restart
+_PROTON_PARTNER_TTL_SECONDS = 300
+# (partner, monotonic load time), always replaced as a whole
+_PROTON_PARTNER: Optional[Tuple[PartnerData, float]] = None
 
 
 def get_proton_partner() -> PartnerData:
     global _PROTON_PARTNER
-    if _PROTON_PARTNER is None:
-        partner = Partner.get_by(name=PROTON_PARTNER_NAME)
-        if partner is None:
-            raise ProtonPartnerNotSetUp
-        Session.expunge(partner)
-        _PROTON_PARTNER = partner.to_partner_data()
-    return _PROTON_PARTNER
+    now = time.monotonic()
+    if _PROTON_PARTNER is not None:
+        partner_data, loaded_at = _PROTON_PARTNER
+        if now - loaded_at < _PROTON_PARTNER_TTL_SECONDS:
+            return partner_data
+
+    partner = Partner.get_by(name=PROTON_PARTNER_NAME)
+    if partner is None:
+        _PROTON_PARTNER = None
+        raise ProtonPartnerNotSetUp
+    # only keep a plain copy so the cache never holds a session-bound instance
+    partner_data = partner.to_partner_data()
+    _PROTON_PARTNER = (partner_data, now)
+    return partner_data
 
 
 def is_proton_partner(partner: Partner) -> bool:
@@ -22,18 +22,20 @@ def perform_proton_account_unlink(
     partner_user = PartnerUser.get_by(
         user_id=current_user.id, partner_id=proton_partner.id
     )
-    if partner_user is not None:
-        LOG.info(f"User {current_user} has unlinked the account from {partner_user}")
-        emit_user_audit_log(
-            user=current_user,
-            action=UserAuditLogAction.UnlinkAccount,
-            message=f"User has unlinked the account (email={partner_user.partner_email} | external_user_id={partner_user.external_user_id})",
-        )
-        EventDispatcher.send_event(
-            partner_user.user, EventContent(user_unlinked=UserUnlinked())
-        )
-        PartnerUser.delete(partner_user.id)
+    if partner_user is None:
+        return None
+    LOG.info(f"User {current_user} has unlinked the account from {partner_user}")
+    emit_user_audit_log(
+        user=current_user,
+        action=UserAuditLogAction.UnlinkAccount,
+        message=f"User has unlinked the account (email={partner_user.partner_email} | external_user_id={partner_user.external_user_id})",
+    )
+    # the event is stored in the same transaction and needs the partner user to still exist
+    EventDispatcher.send_event(
+        partner_user.user, EventContent(user_unlinked=UserUnlinked())
+    )
     external_user_id = partner_user.external_user_id
+    PartnerUser.delete(partner_user.id)
     Session.commit()
     agent.record_custom_event("AccountUnlinked", {"partner": proton_partner.name})
     return external_user_id
@@ -1,12 +1,19 @@
 import re
+from functools import lru_cache
 
 import re2
 
 from app.log import LOG
 
 
+@lru_cache(maxsize=1024)
+def _compile_re2(rule_regex: str):
+    # auto create rules are matched against every email sent to their domain
+    return re2.compile(rule_regex)
+
+
 def regex_match(rule_regex: str, local):
-    regex = re2.compile(rule_regex)
+    regex = _compile_re2(rule_regex)
     try:
         if re2.fullmatch(regex, local):
             return True
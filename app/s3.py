@@ -1,15 +1,25 @@
 import os
+import shutil
 from io import BytesIO
-from typing import Optional
+from typing import List, Optional
 
 import boto3
 import requests
+from boto3.s3.transfer import TransferConfig
 
 from app import config
 from app.log import LOG
 
 _s3_client = None
 
+# S3 DeleteObjects accepts at most 1000 keys per call
+_DELETE_OBJECTS_MAX_KEYS = 1000
+
+_DOWNLOAD_TIMEOUT = (5, 30)
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024, max_concurrency=4, use_threads=True
+)
+
 
 def _get_s3client():
     global _s3_client
@@ -33,14 +43,16 @@ def upload_from_bytesio(key: str, bs: BytesIO, content_type="application/octet-s
         file_dir = os.path.dirname(file_path)
         os.makedirs(file_dir, exist_ok=True)
         with open(file_path, "wb") as f:
-            f.write(bs.read())
+            shutil.copyfileobj(bs, f)
 
     else:
-        _get_s3client().put_object(
-            Bucket=config.BUCKET,
-            Key=key,
-            Body=bs,
-            ContentType=content_type,
+        # big files (e.g. batch import CSVs) are sent in parts instead of a single PUT
+        _get_s3client().upload_fileobj(
+            bs,
+            config.BUCKET,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=_TRANSFER_CONFIG,
         )
 
 
@@ -81,8 +93,26 @@ def download_email(path: str) -> Optional[str]:
 
 
 def upload_from_url(url: str, upload_path):
-    r = requests.get(url)
-    upload_from_bytesio(upload_path, BytesIO(r.content))
+    with requests.get(url, stream=True, timeout=_DOWNLOAD_TIMEOUT) as r:
+        # let urllib3 undo any gzip/deflate transfer encoding while streaming
+        r.raw.decode_content = True
+
+        if config.LOCAL_FILE_UPLOAD:
+            file_path = os.path.join(config.UPLOAD_DIR, upload_path)
+            file_dir = os.path.dirname(file_path)
+            os.makedirs(file_dir, exist_ok=True)
+            with open(file_path, "wb") as f:
+                shutil.copyfileobj(r.raw, f)
+
+        else:
+            # stream the body to S3 without holding the whole file in memory
+            _get_s3client().upload_fileobj(
+                r.raw,
+                config.BUCKET,
+                upload_path,
+                ExtraArgs={"ContentType": "application/octet-stream"},
+                Config=_TRANSFER_CONFIG,
+            )
 
 
 def get_url(key: str, expires_in=3600) -> str:
@@ -104,6 +134,27 @@ def delete(path: str):
         _get_s3client().delete_object(Bucket=config.BUCKET, Key=path)
 
 
+def delete_many(paths: List[str]) -> List[str]:
+    """Delete several files using one DeleteObjects call per 1000 keys.
+    Return the paths that could not be deleted"""
+    if config.LOCAL_FILE_UPLOAD:
+        for path in paths:
+            os.remove(os.path.join(config.UPLOAD_DIR, path))
+        return []
+
+    failed = []
+    for i in range(0, len(paths), _DELETE_OBJECTS_MAX_KEYS):
+        chunk = paths[i : i + _DELETE_OBJECTS_MAX_KEYS]
+        resp = _get_s3client().delete_objects(
+            Bucket=config.BUCKET,
+            Delete={"Objects": [{"Key": path} for path in chunk], "Quiet": True},
+        )
+        for error in resp.get("Errors", []):
+            LOG.w("Cannot delete %s from s3: %s", error["Key"], error.get("Message"))
+            failed.append(error["Key"])
+    return failed
+
+
 def create_bucket_if_not_exists():
     s3client = _get_s3client()
     buckets = s3client.list_buckets()
@@ -11,7 +11,7 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.exc import ObjectDeletedError
 from sqlalchemy.sql import Insert, text
 
-from app import s3, config
+from app import s3, config, dns_utils
 from app.alias_utils import nb_email_log_for_mailbox
 from app.api.views.apple import verify_receipt
 from app.db import Session
@@ -94,14 +94,11 @@ def delete_logs():
     delete_refused_emails()
     delete_old_monitoring()
 
-    for t_email in TransactionalEmail.filter(
-        TransactionalEmail.created_at < arrow.now().shift(days=-7)
-    ):
-        TransactionalEmail.delete(t_email.id)
-
-    for b in Bounce.filter(Bounce.created_at < arrow.now().shift(days=-7)):
-        Bounce.delete(b.id)
-
+    week_ago = arrow.now().shift(days=-7)
+    TransactionalEmail.filter(TransactionalEmail.created_at < week_ago).delete(
+        synchronize_session=False
+    )
+    Bounce.filter(Bounce.created_at < week_ago).delete(synchronize_session=False)
     Session.commit()
 
     LOG.d("Deleting EmailLog older than 2 weeks")
@@ -133,21 +130,43 @@ def delete_logs():
     LOG.i("Deleted %s email logs", total_deleted)
 
 
-def delete_refused_emails():
-    for refused_email in (
-        RefusedEmail.filter_by(deleted=False).order_by(RefusedEmail.id).all()
-    ):
-        if arrow.now().shift(days=1) > refused_email.delete_at >= arrow.now():
-            LOG.d("Delete refused email %s", refused_email)
-            if refused_email.path:
-                s3.delete(refused_email.path)
+# number of refused emails whose files are removed with one s3.delete_many call
+_REFUSED_EMAIL_DELETE_BATCH = 500
 
-            s3.delete(refused_email.full_report_path)
 
+def delete_refused_emails():
+    now = arrow.now()
+    refused_emails = (
+        Session.query(RefusedEmail.id, RefusedEmail.path, RefusedEmail.full_report_path)
+        .filter(
+            RefusedEmail.deleted.is_(False),
+            RefusedEmail.delete_at >= now,
+            RefusedEmail.delete_at < now.shift(days=1),
+        )
+        .order_by(RefusedEmail.id)
+        .all()
+    )
+
+    for i in range(0, len(refused_emails), _REFUSED_EMAIL_DELETE_BATCH):
+        batch = refused_emails[i : i + _REFUSED_EMAIL_DELETE_BATCH]
+        LOG.d("Delete %s refused emails", len(batch))
+        paths = [path for _, path, _ in batch if path] + [
+            full_report_path for _, _, full_report_path in batch
+        ]
+        failed_paths = set(s3.delete_many(paths))
+
+        deleted_ids = [
+            refused_email_id
+            for refused_email_id, path, full_report_path in batch
+            if path not in failed_paths and full_report_path not in failed_paths
+        ]
+        if deleted_ids:
             # do not set path and full_report_path to null
             # so we can check later that the files are indeed deleted
-            refused_email.delete_at = arrow.now()
-            refused_email.deleted = True
+            RefusedEmail.filter(RefusedEmail.id.in_(deleted_ids)).update(
+                {"delete_at": arrow.now(), "deleted": True},
+                synchronize_session=False,
+            )
             Session.commit()
 
     LOG.d("Finish delete_refused_emails")
@@ -316,14 +335,9 @@ def compute_metric2() -> Metric2:
     now = arrow.now()
     _24h_ago = now.shift(days=-1)
 
-    nb_referred_user_paid = 0
-    for user in (
-        User.filter(User.referral_id.isnot(None))
-        .yield_per(500)
-        .enable_eagerloads(False)
-    ):
-        if user.is_paid():
-            nb_referred_user_paid += 1
+    nb_referred_user_paid = User.filter(
+        User.referral_id.isnot(None), User.is_paid_clause()
+    ).count()
 
     # compute nb_proton_premium, nb_proton_user
     nb_proton_premium = nb_proton_user = 0
@@ -348,17 +362,52 @@ def compute_metric2() -> Metric2:
     except ProtonPartnerNotSetUp:
         LOG.d("Proton partner not set up")
 
+    # one query per table, the counts of a table are computed with conditional aggregation
+    nb_user, nb_activated_user, nb_referred_user = Session.query(
+        func.count(User.id),
+        func.count(User.id).filter(User.activated.is_(True)),
+        func.count(User.id).filter(User.referral_id.isnot(None)),
+    ).one()
+    nb_premium, nb_cancelled_premium = Session.query(
+        func.count(Subscription.id).filter(Subscription.cancelled.is_(False)),
+        func.count(Subscription.id).filter(Subscription.cancelled.is_(True)),
+    ).one()
+    (
+        nb_forward_last_24h,
+        nb_bounced_last_24h,
+        nb_reply_last_24h,
+        nb_block_last_24h,
+    ) = (
+        Session.query(
+            func.count(EmailLog.id).filter(
+                and_(
+                    EmailLog.bounced.is_(False),
+                    EmailLog.is_spam.is_(False),
+                    EmailLog.is_reply.is_(False),
+                    EmailLog.blocked.is_(False),
+                )
+            ),
+            func.count(EmailLog.id).filter(EmailLog.bounced.is_(True)),
+            func.count(EmailLog.id).filter(EmailLog.is_reply.is_(True)),
+            func.count(EmailLog.id).filter(EmailLog.blocked.is_(True)),
+        )
+        .filter(EmailLog.created_at > _24h_ago)
+        .one()
+    )
+    nb_verified_custom_domain, nb_subdomain = Session.query(
+        func.count(CustomDomain.id).filter(CustomDomain.verified.is_(True)),
+        func.count(CustomDomain.id).filter(CustomDomain.is_sl_subdomain.is_(True)),
+    ).one()
+
     return Metric2.create(
         date=now,
         # user stats
-        nb_user=User.count(),
-        nb_activated_user=User.filter_by(activated=True).count(),
+        nb_user=nb_user,
+        nb_activated_user=nb_activated_user,
         nb_proton_user=nb_proton_user,
         # subscription stats
-        nb_premium=Subscription.filter(Subscription.cancelled.is_(False)).count(),
-        nb_cancelled_premium=Subscription.filter(
-            Subscription.cancelled.is_(True)
-        ).count(),
+        nb_premium=nb_premium,
+        nb_cancelled_premium=nb_cancelled_premium,
         # todo: filter by expires_date > now
         nb_apple_premium=AppleSubscription.count(),
         nb_manual_premium=ManualSubscription.filter(
@@ -370,26 +419,18 @@ def compute_metric2() -> Metric2:
         ).count(),
         nb_proton_premium=nb_proton_premium,
         # referral stats
-        nb_referred_user=User.filter(User.referral_id.isnot(None)).count(),
+        nb_referred_user=nb_referred_user,
         nb_referred_user_paid=nb_referred_user_paid,
         nb_alias=Alias.count(),
         # email log stats
-        nb_forward_last_24h=EmailLog.filter(EmailLog.created_at > _24h_ago)
-        .filter_by(bounced=False, is_spam=False, is_reply=False, blocked=False)
-        .count(),
-        nb_bounced_last_24h=EmailLog.filter(EmailLog.created_at > _24h_ago)
-        .filter_by(bounced=True)
-        .count(),
+        nb_forward_last_24h=nb_forward_last_24h,
+        nb_bounced_last_24h=nb_bounced_last_24h,
         nb_total_bounced_last_24h=Bounce.filter(Bounce.created_at > _24h_ago).count(),
-        nb_reply_last_24h=EmailLog.filter(EmailLog.created_at > _24h_ago)
-        .filter_by(is_reply=True)
-        .count(),
-        nb_block_last_24h=EmailLog.filter(EmailLog.created_at > _24h_ago)
-        .filter_by(blocked=True)
-        .count(),
+        nb_reply_last_24h=nb_reply_last_24h,
+        nb_block_last_24h=nb_block_last_24h,
         # other stats
-        nb_verified_custom_domain=CustomDomain.filter_by(verified=True).count(),
-        nb_subdomain=CustomDomain.filter_by(is_sl_subdomain=True).count(),
+        nb_verified_custom_domain=nb_verified_custom_domain,
+        nb_subdomain=nb_subdomain,
         nb_directory=Directory.count(),
         nb_deleted_directory=DeletedDirectory.count(),
         nb_deleted_subdomain=DeletedSubdomain.count(),
@@ -715,68 +756,106 @@ def set_custom_domain_for_alias():
     Session.commit()
 
 
-def sanitize_alias_address_name():
-    count = 0
-    # using Alias.all() will take all the memory
-    for alias in Alias.yield_per_query():
-        if count % 1000 == 0:
-            LOG.d("process %s", count)
+# an address made only of these characters is left unchanged by sanitize_email()
+# and normalize_reply_email(), so only the rows matching the patterns are checked
+_MAYBE_NOT_SANITIZED_EMAIL = "[^a-z0-9._@+-]"
+_MAYBE_NOT_SANITIZED_EMAIL_NOT_LOWER = "[^a-zA-Z0-9._@+-]"
 
-        count += 1
-        if sanitize_email(alias.email) != alias.email:
-            LOG.e("Alias %s email not sanitized", alias)
 
-        if alias.name and "\n" in alias.name:
-            alias.name = alias.name.replace("\n", "")
-            Session.commit()
-            LOG.e("Alias %s name contains linebreak %s", alias, alias.name)
+def _maybe_not_sanitized(column, not_lower=False):
+    return column.op("~")(
+        _MAYBE_NOT_SANITIZED_EMAIL_NOT_LOWER
+        if not_lower
+        else _MAYBE_NOT_SANITIZED_EMAIL
+    )
+
+
+def sanitize_alias_address_name():
+    for alias_id, email in Session.query(Alias.id, Alias.email).filter(
+        _maybe_not_sanitized(Alias.email)
+    ):
+        if sanitize_email(email) != email:
+            LOG.e("Alias %s email not sanitized %s", alias_id, email)
+
+    aliases_with_linebreak = (
+        Session.query(Alias.id, Alias.name).filter(Alias.name.contains("\n")).all()
+    )
+    for alias_id, name in aliases_with_linebreak:
+        LOG.e("Alias %s name contains linebreak %s", alias_id, name)
+
+    if aliases_with_linebreak:
+        Alias.filter(
+            Alias.id.in_([alias_id for alias_id, _ in aliases_with_linebreak])
+        ).update(
+            {"name": func.replace(Alias.name, "\n", "")}, synchronize_session=False
+        )
+        Session.commit()
 
 
 def sanity_check():
     LOG.d("sanitize user email")
-    for user in User.filter_by(activated=True).all():
-        if sanitize_email(user.email) != user.email:
-            LOG.e("%s does not have sanitized email", user)
+    for user_id, email in Session.query(User.id, User.email).filter(
+        User.activated.is_(True), _maybe_not_sanitized(User.email)
+    ):
+        if sanitize_email(email) != email:
+            LOG.e("User %s does not have sanitized email %s", user_id, email)
 
     LOG.d("sanitize alias address & name")
     sanitize_alias_address_name()
 
-    LOG.d("sanity contact address")
-    contact_email_sanity_date = arrow.get("2021-01-12")
-    for contact in Contact.yield_per_query():
-        if sanitize_email(contact.reply_email) != contact.reply_email:
-            LOG.e("Contact %s reply-email not sanitized", contact)
-
-        if (
-            sanitize_email(contact.website_email, not_lower=True)
-            != contact.website_email
-            and contact.created_at > contact_email_sanity_date
-        ):
-            LOG.e("Contact %s website-email not sanitized", contact)
-
-        if not contact.invalid_email and not is_valid_email(contact.website_email):
-            LOG.e("%s invalid email", contact)
-            contact.invalid_email = True
-    Session.commit()
+    LOG.d("sanity contact address & normalize reverse alias")
+    for contact_id, reply_email in Session.query(
+        Contact.id, Contact.reply_email
+    ).filter(_maybe_not_sanitized(Contact.reply_email)):
+        if sanitize_email(reply_email) != reply_email:
+            LOG.e("Contact %s reply-email not sanitized", contact_id)
 
-    LOG.d("sanitize mailbox address")
-    for mailbox in Mailbox.yield_per_query():
-        if sanitize_email(mailbox.email) != mailbox.email:
-            LOG.e("Mailbox %s address not sanitized", mailbox)
-
-    LOG.d("normalize reverse alias")
-    for contact in Contact.yield_per_query():
-        if normalize_reply_email(contact.reply_email) != contact.reply_email:
+        if normalize_reply_email(reply_email) != reply_email:
             LOG.e(
                 "Contact %s reply email is not normalized %s",
-                contact,
-                contact.reply_email,
+                contact_id,
+                reply_email,
             )
 
+    contact_email_sanity_date = arrow.get("2021-01-12")
+    for contact_id, website_email in Session.query(
+        Contact.id, Contact.website_email
+    ).filter(
+        Contact.created_at > contact_email_sanity_date,
+        _maybe_not_sanitized(Contact.website_email, not_lower=True),
+    ):
+        if sanitize_email(website_email, not_lower=True) != website_email:
+            LOG.e("Contact %s website-email not sanitized", contact_id)
+
+    # email validity cannot be expressed in SQL, only the columns needed are loaded
+    invalid_contact_ids = []
+    for contact_id, website_email in (
+        Session.query(Contact.id, Contact.website_email)
+        .filter(Contact.invalid_email.is_(False))
+        .yield_per(2000)
+    ):
+        if not is_valid_email(website_email):
+            LOG.e("Contact %s invalid email %s", contact_id, website_email)
+            invalid_contact_ids.append(contact_id)
+
+    if invalid_contact_ids:
+        Contact.filter(Contact.id.in_(invalid_contact_ids)).update(
+            {"invalid_email": True}, synchronize_session=False
+        )
+        Session.commit()
+
+    LOG.d("sanitize mailbox address")
+    for mailbox_id, email in Session.query(Mailbox.id, Mailbox.email).filter(
+        _maybe_not_sanitized(Mailbox.email)
+    ):
+        if sanitize_email(email) != email:
+            LOG.e("Mailbox %s address not sanitized %s", mailbox_id, email)
+
     LOG.d("clean domain name")
-    for domain in CustomDomain.yield_per_query():
-        if domain.name and "\n" in domain.name:
-            LOG.e("Domain %s name contain linebreak %s", domain, domain.name)
+    for domain_id, name in Session.query(CustomDomain.id, CustomDomain.name).filter(
+        CustomDomain.name.contains("\n")
+    ):
+        LOG.e("Domain %s name contain linebreak %s", domain_id, name)
 
     LOG.d("migrate domain trash if needed")
     migrate_domain_trash()
@@ -805,14 +884,35 @@ def sanity_check():
     LOG.d("Finish sanity check")
 
 
+_MAILBOX_DNS_PREFETCH_WORKERS = 16
+
+
 def check_mailbox_valid_domain():
     """detect if there's mailbox that's using an invalid domain"""
-    mailbox_ids = (
-        Session.query(Mailbox.id)
+    mailboxes = (
+        Session.query(Mailbox.id, Mailbox.email)
         .filter(Mailbox.verified.is_(True), Mailbox.disabled.is_(False))
         .all()
     )
-    mailbox_ids = [e[0] for e in mailbox_ids]
+    mailbox_ids = [mailbox_id for mailbox_id, _ in mailboxes]
+
+    # resolve the MX records of all mailbox domains in parallel upfront
+    # instead of one mailbox after another in the loop below
+    previous_dns_client = dns_utils.global_dns_client
+    dns_client = dns_utils.MxPrefetchDNSClient(
+        dns_utils.get_network_dns_client(), max_workers=_MAILBOX_DNS_PREFETCH_WORKERS
+    )
+    dns_client.prefetch_mx(
+        {email.split("@")[-1].lower() for _, email in mailboxes if "@" in email}
+    )
+    dns_utils.set_global_dns_client(dns_client)
+    try:
+        _check_mailboxes_valid_domain(mailbox_ids)
+    finally:
+        dns_utils.set_global_dns_client(previous_dns_client)
+
+
+def _check_mailboxes_valid_domain(mailbox_ids: List[int]):
     # iterate over id instead of mailbox directly
     # as a mailbox can be deleted in the meantime
     for mailbox_id in mailbox_ids:
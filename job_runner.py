@@ -25,7 +25,9 @@ from app.import_utils import handle_batch_import
 from app.jobs.event_jobs import send_alias_creation_events_for_user
 from app.jobs.export_user_data_job import ExportUserDataJob
 from app.jobs.mark_abuser_job import MarkAbuserJob
+from app.jobs.send_admin_email_job import SendAdminEmailJob
 from app.jobs.send_event_job import SendEventToWebhookJob
+from app.jobs.sync_profile_picture_job import SyncProfilePictureJob
 from app.jobs.sync_subscription_job import SyncSubscriptionJob
 from app.log import LOG
 from app.models import User, Job, BatchImport, Mailbox, JobState
@@ -308,6 +310,14 @@ def process_job(job: Job):
         mark_abuser_job = MarkAbuserJob.create_from_job(job)
         if mark_abuser_job:
             mark_abuser_job.run()
+    elif job.name == JobType.SYNC_PROFILE_PICTURE.value:
+        sync_picture_job = SyncProfilePictureJob.create_from_job(job)
+        if sync_picture_job:
+            sync_picture_job.run()
+    elif job.name == JobType.SEND_ADMIN_EMAIL.value:
+        admin_email_job = SendAdminEmailJob.create_from_job(job)
+        if admin_email_job:
+            admin_email_job.run()
     else:
         LOG.e("Unknown job name %s", job.name)
 
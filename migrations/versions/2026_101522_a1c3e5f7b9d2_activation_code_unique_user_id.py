@@ -0,0 +1,41 @@
+"""Activation code unique user id
+
+Revision ID: a1c3e5f7b9d2
+Revises: 3ee37864eb67
+Create Date: 2026-10-15 22:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f7b9d2'
+down_revision = '3ee37864eb67'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # only keep the latest activation code of each user
+    op.execute(
+        """
+        DELETE FROM activation_code a
+        USING activation_code b
+        WHERE a.user_id = b.user_id AND a.id < b.id
+        """
+    )
+    # build the new index under a temporary name so the column keeps an index if the build fails
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_activation_code_user_id_tmp')
+        op.create_index('ix_activation_code_user_id_tmp', 'activation_code', ['user_id'], unique=True, postgresql_concurrently=True)
+        op.drop_index('ix_activation_code_user_id', table_name='activation_code', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_activation_code_user_id_tmp RENAME TO ix_activation_code_user_id')
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_activation_code_user_id_tmp')
+        op.create_index('ix_activation_code_user_id_tmp', 'activation_code', ['user_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_activation_code_user_id', table_name='activation_code', postgresql_concurrently=True)
+        op.execute('ALTER INDEX ix_activation_code_user_id_tmp RENAME TO ix_activation_code_user_id')
@@ -0,0 +1,58 @@
+"""Hash legacy alias transfer tokens
+
+Revision ID: b2d4f6a8c0e1
+Revises: a1c3e5f7b9d2
+Create Date: 2026-10-15 23:10:00.000000
+
+"""
+import base64
+import hmac
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import ALIAS_TRANSFER_TOKEN_SECRET
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c0e1'
+down_revision = 'a1c3e5f7b9d2'
+branch_labels = None
+depends_on = None
+
+
+def _hmac_token(transfer_token: str) -> str:
+    # same as app.dashboard.views.alias_transfer.hmac_alias_transfer_token
+    alias_hmac = hmac.digest(
+        ALIAS_TRANSFER_TOKEN_SECRET.encode("utf-8"),
+        transfer_token.encode("utf-8"),
+        "sha3_224",
+    )
+    return base64.urlsafe_b64encode(alias_hmac).decode("utf-8").rstrip("=")
+
+
+def upgrade():
+    conn = op.get_bind()
+    # legacy tokens were stored as is with the {alias_id}.{random} format,
+    # hashed tokens are urlsafe base64 and never contain a dot
+    rows = conn.execute(
+        sa.text("SELECT id, transfer_token FROM alias WHERE transfer_token LIKE '%.%'")
+    ).fetchall()
+    for alias_id, transfer_token in rows:
+        conn.execute(
+            sa.text("UPDATE alias SET transfer_token = :token WHERE id = :id"),
+            {"token": _hmac_token(transfer_token), "id": alias_id},
+        )
+    # legacy tokens had no expiration, give them the 24 hours a new token gets
+    conn.execute(
+        sa.text(
+            "UPDATE alias SET transfer_token_expiration = "
+            "(now() AT TIME ZONE 'utc') + interval '24 hours' "
+            "WHERE transfer_token IS NOT NULL AND transfer_token_expiration IS NULL"
+        )
+    )
+
+
+def downgrade():
+    # the raw tokens cannot be recovered from their hash
+    pass
@@ -0,0 +1,26 @@
+"""Alias trash user index
+
+Revision ID: c4e6a8b0d2f3
+Revises: b2d4f6a8c0e1
+Create Date: 2026-10-15 23:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e6a8b0d2f3'
+down_revision = 'b2d4f6a8c0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_alias_user_id_delete_on', 'alias', ['user_id', 'delete_on'], unique=False, postgresql_where=sa.text("delete_on IS NOT NULL"), postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_alias_user_id_delete_on', table_name='alias', postgresql_concurrently=True)
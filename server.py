@@ -126,7 +126,10 @@ def create_app() -> Flask:
 
     app.secret_key = FLASK_SECRET
 
-    app.config["TEMPLATES_AUTO_RELOAD"] = True
+    # templates are compiled once and kept in the jinja cache. Without auto-reload jinja doesn't
+    # stat every template (and the ones it extends/includes) on each render.
+    # Flask still reloads them when running in debug mode.
+    app.config["TEMPLATES_AUTO_RELOAD"] = None
 
     # to have a "fluid" layout for admin
     app.config["FLASK_ADMIN_FLUID_LAYOUT"] = True
@@ -21,3 +21,16 @@ def test_login_with_proton(flask_client):
     assert "code" == query["response_type"][0]
     assert PROTON_CLIENT_ID == query["client_id"][0]
     assert expected_redirect_url == query["redirect_uri"][0]
+
+
+def test_proton_callback_without_action_in_session(flask_client):
+    with flask_client.session_transaction() as session:
+        session["oauth_state"] = "state"
+
+    r = flask_client.get(
+        url_for("auth.proton_callback", code="code", state="state"),
+        follow_redirects=False,
+    )
+
+    assert r.status_code == 302
+    assert r.headers.get("Location").endswith(url_for("auth.login"))
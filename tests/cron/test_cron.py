@@ -2,8 +2,21 @@ import arrow
 
 import cron
 from app.db import Session
-from app.models import CoinbaseSubscription, ApiToCookieToken, ApiKey, User
-from tests.utils import create_new_user
+from app.models import (
+    CoinbaseSubscription,
+    ApiToCookieToken,
+    ApiKey,
+    User,
+    Referral,
+    ManualSubscription,
+    Subscription,
+    PlanEnum,
+    Alias,
+    Contact,
+    EmailLog,
+    CustomDomain,
+)
+from tests.utils import create_new_user, random_token, random_domain
 
 
 def test_notify_manual_sub_end(flask_client):
@@ -53,3 +66,96 @@ def test_cleanup_users():
     assert User.get(u_delete_none_id) is not None
     assert User.get(u_delete_grace_has_not_expired_id) is not None
     assert User.get(u_delete_grace_has_expired_id) is None
+
+
+def test_compute_metric2(flask_client):
+    now = arrow.now()
+    referrer = create_new_user()
+    referral = Referral.create(user_id=referrer.id, code=random_token(), flush=True)
+    # one referred user pays, the other does not
+    paid_user = create_new_user()
+    paid_user.referral_id = referral.id
+    ManualSubscription.create(
+        user_id=paid_user.id, end_at=now.shift(days=10), flush=True
+    )
+    create_new_user().referral_id = referral.id
+
+    for cancelled in (False, True):
+        Subscription.create(
+            user_id=create_new_user().id,
+            cancel_url="https://checkout.paddle.com/subscription/cancel?user=1234",
+            update_url="https://checkout.paddle.com/subscription/update?user=1234",
+            subscription_id=random_token(),
+            event_time=now,
+            next_bill_date=now.shift(days=10).date(),
+            plan=PlanEnum.monthly,
+            cancelled=cancelled,
+            flush=True,
+        )
+
+    alias = Alias.create_new_random(referrer)
+    contact = Contact.create(
+        user_id=referrer.id,
+        alias_id=alias.id,
+        website_email=f"{random_token()}@{random_domain()}",
+        reply_email=f"{random_token()}@{random_domain()}",
+        flush=True,
+    )
+    for flags in (
+        {},
+        {"bounced": True},
+        {"is_reply": True},
+        {"blocked": True},
+        {"is_spam": True},
+        {"created_at": now.shift(days=-2)},
+    ):
+        EmailLog.create(
+            user_id=referrer.id,
+            mailbox_id=alias.mailbox_id,
+            alias_id=alias.id,
+            contact_id=contact.id,
+            flush=True,
+            **flags,
+        )
+
+    CustomDomain.create(user_id=referrer.id, domain=random_domain(), verified=True)
+    CustomDomain.create(
+        user_id=referrer.id, domain=random_domain(), is_sl_subdomain=True
+    )
+    Session.commit()
+
+    metric = cron.compute_metric2()
+
+    # compare with the counts computed one query at a time
+    _24h_ago = now.shift(days=-1)
+    assert metric.nb_user == User.count()
+    assert metric.nb_activated_user == User.filter_by(activated=True).count()
+    referred_users = User.filter(User.referral_id.isnot(None)).all()
+    assert metric.nb_referred_user == len(referred_users)
+    assert metric.nb_referred_user_paid == len(
+        [user for user in referred_users if user.is_paid()]
+    )
+    assert metric.nb_referred_user_paid >= 1
+    assert metric.nb_premium == Subscription.filter_by(cancelled=False).count()
+    assert metric.nb_cancelled_premium == Subscription.filter_by(cancelled=True).count()
+
+    recent_email_logs = EmailLog.filter(EmailLog.created_at > _24h_ago)
+    assert (
+        metric.nb_forward_last_24h
+        == recent_email_logs.filter_by(
+            bounced=False, is_spam=False, is_reply=False, blocked=False
+        ).count()
+    )
+    assert (
+        metric.nb_bounced_last_24h == recent_email_logs.filter_by(bounced=True).count()
+    )
+    assert (
+        metric.nb_reply_last_24h == recent_email_logs.filter_by(is_reply=True).count()
+    )
+    assert metric.nb_block_last_24h == recent_email_logs.filter_by(blocked=True).count()
+
+    assert (
+        metric.nb_verified_custom_domain
+        == CustomDomain.filter_by(verified=True).count()
+    )
+    assert metric.nb_subdomain == CustomDomain.filter_by(is_sl_subdomain=True).count()
@@ -1,5 +1,8 @@
+from flask import url_for
+
 import app.alias_utils
 from app import config
+from app.dashboard.views.alias_transfer import hmac_alias_transfer_token
 from app.db import Session
 from app.events.event_dispatcher import GlobalDispatcher
 from app.models import (
@@ -12,7 +15,7 @@ from tests.events.event_test_utils import (
     _get_event_from_string,
     _create_linked_user,
 )
-from tests.utils import login
+from tests.utils import create_new_user, login
 
 on_memory_dispatcher = OnMemoryDispatcher()
 
@@ -70,3 +73,27 @@ def test_alias_transfer(flask_client):
     assert alias.email == alias_created.email
     assert alias.note or "" == alias_created.note
     assert alias.enabled == alias_created.enabled
+
+
+def test_hmac_alias_transfer_token_uses_current_secret(monkeypatch):
+    token = hmac_alias_transfer_token("1.token")
+    assert hmac_alias_transfer_token("1.token") == token
+
+    monkeypatch.setattr(config, "ALIAS_TRANSFER_TOKEN_SECRET", "another secret")
+    assert hmac_alias_transfer_token("1.token") != token
+
+
+def test_alias_transfer_receive_token_without_expiration(flask_client):
+    alias = Alias.create_new_random(create_new_user())
+    alias.transfer_token = hmac_alias_transfer_token(f"{alias.id}.token")
+    alias.transfer_token_expiration = None
+    Session.commit()
+
+    login(flask_client)
+    r = flask_client.get(
+        url_for("dashboard.alias_transfer_receive_route", token=f"{alias.id}.token"),
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert "Expired link, please request a new one" in r.data.decode()
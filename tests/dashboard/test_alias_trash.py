@@ -0,0 +1,37 @@
+from flask import url_for
+
+from app import alias_delete
+from app.config import PAGE_LIMIT
+from app.db import Session
+from app.models import Alias
+from tests.utils import login
+
+
+def test_alias_trash_shows_total_count(flask_client):
+    user = login(flask_client)
+    nb_trashed = PAGE_LIMIT + 2
+    for _ in range(nb_trashed):
+        alias = Alias.create_new_random(user)
+        alias_delete.move_alias_to_trash(alias, user)
+    Session.commit()
+
+    r = flask_client.get(url_for("dashboard.alias_trash"))
+    assert r.status_code == 200
+    assert f"{nb_trashed} Deleted alias" in r.data.decode()
+
+    r = flask_client.get(url_for("dashboard.alias_trash", page=1))
+    assert r.status_code == 200
+    assert f"{nb_trashed} Deleted alias" in r.data.decode()
+
+    # out of range page
+    r = flask_client.get(url_for("dashboard.alias_trash", page=5))
+    assert r.status_code == 200
+    assert f"{nb_trashed} Deleted alias" in r.data.decode()
+
+
+def test_alias_trash_empty(flask_client):
+    login(flask_client)
+
+    r = flask_client.get(url_for("dashboard.alias_trash"))
+    assert r.status_code == 200
+    assert "0 Deleted alias" in r.data.decode()
@@ -2,7 +2,7 @@ from flask import url_for
 
 from app.db import Session
 from app.email_utils import get_email_domain_part
-from app.models import Mailbox
+from app.models import Mailbox, CustomDomain, AutoCreateRule
 from tests.utils import login, random_domain
 
 
@@ -59,3 +59,94 @@ def test_add_domain_used_in_mailbox(flask_client):
 
     assert r.status_code == 200
     assert b"new-domain.com already used in a SimpleLogin mailbox" in r.data
+
+
+def test_add_auto_create_rule_with_used_order(flask_client):
+    user = login(flask_client)
+    user.lifetime = True
+    custom_domain = CustomDomain.create(
+        user_id=user.id, domain=random_domain(), ownership_verified=True, flush=True
+    )
+    AutoCreateRule.create(
+        custom_domain_id=custom_domain.id, order=1, regex="first.*", commit=True
+    )
+
+    r = flask_client.post(
+        url_for(
+            "dashboard.domain_detail_auto_create", custom_domain_id=custom_domain.id
+        ),
+        data={
+            "form-name": "create-auto-create-rule",
+            "regex": "second.*",
+            "order": 1,
+            "mailbox_ids": [user.default_mailbox_id],
+        },
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert b"Another rule with the same order already exists" in r.data
+    assert AutoCreateRule.filter_by(custom_domain_id=custom_domain.id).count() == 1
+
+
+def test_add_auto_create_rule_with_invalid_regex(flask_client):
+    user = login(flask_client)
+    user.lifetime = True
+    custom_domain = CustomDomain.create(
+        user_id=user.id, domain=random_domain(), ownership_verified=True, commit=True
+    )
+
+    r = flask_client.post(
+        url_for(
+            "dashboard.domain_detail_auto_create", custom_domain_id=custom_domain.id
+        ),
+        data={
+            "form-name": "create-auto-create-rule",
+            "regex": "(",
+            "order": 1,
+            "mailbox_ids": [user.default_mailbox_id],
+        },
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert b"Invalid regex (" in r.data
+    assert AutoCreateRule.filter_by(custom_domain_id=custom_domain.id).count() == 0
+
+
+def test_delete_auto_create_rule_of_another_domain(flask_client):
+    user = login(flask_client)
+    user.lifetime = True
+    custom_domain = CustomDomain.create(
+        user_id=user.id, domain=random_domain(), ownership_verified=True, commit=True
+    )
+    other_domain = CustomDomain.create(
+        user_id=user.id, domain=random_domain(), ownership_verified=True, commit=True
+    )
+    rule_id = AutoCreateRule.create(
+        custom_domain_id=other_domain.id, order=1, regex="first.*", commit=True
+    ).id
+
+    r = flask_client.post(
+        url_for(
+            "dashboard.domain_detail_auto_create", custom_domain_id=custom_domain.id
+        ),
+        data={"form-name": "delete-auto-create-rule", "rule-id": rule_id},
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert b"Something wrong, please retry" in r.data
+    assert AutoCreateRule.get(rule_id) is not None
+
+    r = flask_client.post(
+        url_for(
+            "dashboard.domain_detail_auto_create", custom_domain_id=other_domain.id
+        ),
+        data={"form-name": "delete-auto-create-rule", "rule-id": rule_id},
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert b"Rule #1 has been deleted" in r.data
+    assert AutoCreateRule.get(rule_id) is None
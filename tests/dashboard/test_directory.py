@@ -2,7 +2,7 @@ from flask import url_for
 
 from app.config import MAX_NB_DIRECTORY
 from app.models import Directory
-from tests.utils import login, random_token
+from tests.utils import create_new_user, login, random_token
 
 
 def test_create_directory(flask_client):
@@ -35,6 +35,23 @@ def test_create_directory_with_invalid_name(flask_client):
         assert Directory.get_by(name=directory_name) is None
 
 
+def test_create_directory_already_used(flask_client):
+    other_user = create_new_user()
+    directory_name = random_token()
+    Directory.create(name=directory_name, user_id=other_user.id, commit=True)
+
+    login(flask_client)
+    r = flask_client.post(
+        url_for("dashboard.directory"),
+        data={"form-name": "create", "name": directory_name},
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert f"{directory_name} already used" in r.data.decode()
+    assert Directory.get_by(name=directory_name).user_id == other_user.id
+
+
 def test_delete_directory(flask_client):
     """cannot add domain if user personal email uses this domain"""
     user = login(flask_client)
@@ -0,0 +1,54 @@
+from flask import url_for
+
+from app.models import Referral
+from tests.utils import create_new_user, login, random_token
+
+
+def test_create_referral(flask_client):
+    user = login(flask_client)
+    code = random_token()
+
+    r = flask_client.post(
+        url_for("dashboard.referral_route"),
+        data={"form-name": "create", "code": code, "name": "my referral"},
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert "A new referral code has been created" in r.data.decode()
+    referral = Referral.get_by(code=code)
+    assert referral.user_id == user.id
+    assert referral.name == "my referral"
+
+
+def test_create_referral_with_invalid_code(flask_client):
+    login(flask_client)
+
+    for code in ("ab", "UPPER", "with space", "a@b.c", "code\n"):
+        r = flask_client.post(
+            url_for("dashboard.referral_route"),
+            data={"form-name": "create", "code": code},
+            follow_redirects=True,
+        )
+
+        assert r.status_code == 200
+        assert "At least 3 characters" in r.data.decode()
+        assert Referral.get_by(code=code) is None
+
+
+def test_create_referral_code_already_used(flask_client):
+    other_user = create_new_user()
+    code = random_token()
+    Referral.create(user_id=other_user.id, code=code, commit=True)
+
+    user = login(flask_client)
+    r = flask_client.post(
+        url_for("dashboard.referral_route"),
+        data={"form-name": "create", "code": code},
+        follow_redirects=True,
+    )
+
+    assert r.status_code == 200
+    assert "Code already used" in r.data.decode()
+    assert Referral.get_by(code=code).user_id == other_user.id
+    assert Referral.filter_by(user_id=user.id).count() == 0
@@ -159,6 +159,7 @@ def test_request_disable_alias(flask_client):
         follow_redirects=True,
     )
     assert 200 == req.status_code
+    assert f"Alias {alias.email} has been blocked" in req.data.decode()
     assert not Alias.get(alias.id).enabled
     assert 1 == len(mail_sender.get_stored_emails())
 
@@ -184,6 +185,7 @@ def test_request_disable_contact(flask_client):
         follow_redirects=True,
     )
     assert 200 == req.status_code
+    assert "Emails sent from contact@example.com are now blocked" in req.data.decode()
     assert Contact.get(contact.id).block_forward
     assert 1 == len(mail_sender.get_stored_emails())
 
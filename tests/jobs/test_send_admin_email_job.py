@@ -0,0 +1,13 @@
+from app.constants import JobType
+from app.jobs.send_admin_email_job import SendAdminEmailJob
+from tests.utils import random_token
+
+
+def test_serialize_and_deserialize_job():
+    subject = f"Subject {random_token()}"
+    db_job = SendAdminEmailJob(subject, html="<b>hi</b>").store_job_in_db()
+    assert db_job.name == JobType.SEND_ADMIN_EMAIL.value
+
+    job = SendAdminEmailJob.create_from_job(db_job)
+    assert job._subject == subject
+    assert job._html == "<b>hi</b>"
@@ -0,0 +1,31 @@
+import arrow
+
+from app.constants import JobType
+from app.db import Session
+from app.jobs.sync_profile_picture_job import SyncProfilePictureJob
+from app.models import File
+from tests.utils import create_new_user, random_token
+
+
+def test_serialize_and_deserialize_job():
+    user = create_new_user()
+    run_at = arrow.now().shift(hours=10)
+    picture_url = f"https://picture.lan/{random_token()}.png"
+    db_job = SyncProfilePictureJob(user, picture_url).store_job_in_db(run_at=run_at)
+    assert db_job.run_at == run_at
+    assert db_job.name == JobType.SYNC_PROFILE_PICTURE.value
+
+    job = SyncProfilePictureJob.create_from_job(db_job)
+    assert job._user.id == user.id
+    assert job._picture_url == picture_url
+
+
+def test_does_not_override_existing_picture():
+    user = create_new_user()
+    file = File.create(path=random_token(), user_id=user.id, flush=True)
+    user.profile_picture_id = file.id
+    Session.flush()
+
+    SyncProfilePictureJob(user, "https://picture.lan/new.png").run()
+
+    assert user.profile_picture_id == file.id
@@ -1,5 +1,6 @@
 import pytest
 from http import HTTPStatus
+from requests import Response
 
 from app.errors import ProtonAccountNotVerified
 from app.proton import proton_client
@@ -48,3 +49,31 @@ def test_handle_response_not_ok_unknown_error():
         text=error_text,
     )
     assert error_text in res.args[0]
+
+
+def _client_returning(status: int, content: bytes) -> proton_client.HttpProtonClient:
+    client = proton_client.HttpProtonClient(
+        "https://proton.lan",
+        proton_client.AccessCredentials(access_token="token", session_id="session"),
+        None,
+    )
+    res = Response()
+    res.status_code = status
+    res._content = content
+    client.client.get = lambda url: res
+    return client
+
+
+def test_get_user_account_not_verified():
+    client = _client_returning(
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        b'{"Code": %d}' % proton_client.PROTON_ERROR_CODE_HV_NEEDED,
+    )
+    with pytest.raises(ProtonAccountNotVerified):
+        client.get_user()
+
+
+def test_get_user_non_json_error():
+    client = _client_returning(HTTPStatus.BAD_GATEWAY, b"<html>Bad gateway</html>")
+    with pytest.raises(Exception, match="Bad gateway"):
+        client.get_user()
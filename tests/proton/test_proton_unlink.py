@@ -0,0 +1,25 @@
+from app.models import PartnerUser
+from app.proton.proton_partner import get_proton_partner
+from app.proton.proton_unlink import perform_proton_account_unlink
+from app.utils import random_string
+from tests.utils import create_new_user, random_email
+
+
+def test_unlink_account_without_partner_user():
+    user = create_new_user()
+    assert perform_proton_account_unlink(user) is None
+
+
+def test_unlink_account():
+    user = create_new_user()
+    external_user_id = random_string()
+    PartnerUser.create(
+        user_id=user.id,
+        partner_id=get_proton_partner().id,
+        partner_email=random_email(),
+        external_user_id=external_user_id,
+        flush=True,
+    )
+
+    assert perform_proton_account_unlink(user) == external_user_id
+    assert PartnerUser.get_by(user_id=user.id) is None
@@ -577,3 +577,40 @@ def test_custom_domain_validation_validate_dmarc_records_success():
 
     db_domain = CustomDomain.get_by(id=domain.id)
     assert db_domain.dmarc_verified is True
+
+
+# validate_all_records
+def test_custom_domain_validation_validate_all_records():
+    dkim_domain = random_domain()
+    dns_client = InMemoryDNSClient()
+    validator = CustomDomainValidation(dkim_domain, dns_client)
+
+    domain = create_custom_domain(random_domain())
+    domain.ownership_verified = True
+    Session.commit()
+
+    mx_records_by_prio = validator.get_expected_mx_records(domain)
+    dns_client.set_mx_records(
+        domain.domain,
+        {
+            priority: mx_records_by_prio[priority].allowed
+            for priority in mx_records_by_prio
+        },
+    )
+    dns_client.set_txt_record(f"_dmarc.{domain.domain}", [DMARC_RECORD])
+    for prefix, expected in validator.get_dkim_records(domain).items():
+        dns_client.set_cname_record(f"{prefix}.{domain.domain}", expected.recommended)
+
+    res = validator.validate_all_records(domain)
+
+    assert "ownership" not in res
+    assert res["mx"].success is True
+    assert res["spf"].success is False
+    assert res["dkim"] == {}
+    assert res["dmarc"].success is True
+
+    db_domain = CustomDomain.get_by(id=domain.id)
+    assert db_domain.verified is True
+    assert db_domain.spf_verified is False
+    assert db_domain.dkim_verified is True
+    assert db_domain.dmarc_verified is True
@@ -3,6 +3,7 @@ from app.dns_utils import (
     get_mx_domains,
     get_network_dns_client,
     InMemoryDNSClient,
+    MxPrefetchDNSClient,
 )
 
 from tests.utils import random_domain
@@ -88,3 +89,26 @@ def test_get_spf_record():
     client.set_txt_record(domain, [spf_record, "another record"])
     res = client.get_spf_domain(domain)
     assert res == [sl_domain]
+
+
+def test_mx_prefetch_dns_client():
+    client = InMemoryDNSClient()
+
+    domain = random_domain()
+    mx_domain = random_domain()
+    client.set_mx_records(domain, {10: [mx_domain + "."]})
+    client.set_a_record(mx_domain, "1.2.3.4")
+
+    prefetch_client = MxPrefetchDNSClient(client, max_workers=2)
+    prefetch_client.prefetch_mx([domain])
+
+    # records are served from the prefetch even if they change afterwards
+    client.set_mx_records(domain, {})
+    client.set_a_record(mx_domain, "5.6.7.8")
+    assert prefetch_client.get_mx_domains(domain) == {10: [mx_domain + "."]}
+    assert prefetch_client.get_a_record(mx_domain) == "1.2.3.4"
+
+    # not prefetched: go to the wrapped client
+    other_domain = random_domain()
+    client.set_mx_records(other_domain, {20: [mx_domain + "."]})
+    assert prefetch_client.get_mx_domains(other_domain) == {20: [mx_domain + "."]}
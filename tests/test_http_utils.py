@@ -0,0 +1,13 @@
+import requests
+
+from app.http_utils import mount_pooled_adapter
+
+
+def test_mount_pooled_adapter_shares_connection_pool():
+    s1 = mount_pooled_adapter(requests.Session())
+    s2 = mount_pooled_adapter(requests.Session())
+
+    assert s1.get_adapter("https://api.github.com") is s2.get_adapter(
+        "https://www.googleapis.com"
+    )
+    assert s1.get_adapter("http://localhost") is s1.get_adapter("https://localhost")
@@ -17,6 +17,7 @@ from app.mailbox_utils import (
     get_mailbox_for_reply_phase,
     request_mailbox_email_change,
     count_mailbox_aliases,
+    get_verified_mailboxes_by_ids,
 )
 from app.models import (
     Mailbox,
@@ -990,3 +991,26 @@ def test_admin_disable_reenable_without_admin_user(flask_client):
     # Verify still no AdminAuditLog was created
     admin_logs = Session.query(AdminAuditLog).filter_by(model_id=mailbox.id).all()
     assert len(admin_logs) == 0
+
+
+def test_get_verified_mailboxes_by_ids(flask_client):
+    user = create_new_user()
+    other_user = create_new_user()
+    mb1 = Mailbox.create(user_id=user.id, email=random_email(), verified=True)
+    mb2 = Mailbox.create(user_id=user.id, email=random_email(), verified=True)
+    unverified = Mailbox.create(user_id=user.id, email=random_email(), verified=False)
+    other_mb = Mailbox.create(
+        user_id=other_user.id, email=random_email(), verified=True
+    )
+    Session.commit()
+
+    # order of the ids is kept
+    mailboxes = get_verified_mailboxes_by_ids(user, [str(mb2.id), str(mb1.id)])
+    assert [mb.id for mb in mailboxes] == [mb2.id, mb1.id]
+
+    assert get_verified_mailboxes_by_ids(user, []) == []
+    assert get_verified_mailboxes_by_ids(user, [str(mb1.id), "abc"]) is None
+    assert (
+        get_verified_mailboxes_by_ids(user, [str(mb1.id), str(unverified.id)]) is None
+    )
+    assert get_verified_mailboxes_by_ids(user, [str(mb1.id), str(other_mb.id)]) is None
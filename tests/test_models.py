@@ -17,9 +17,13 @@ from app.models import (
     Subscription,
     PlanEnum,
     PADDLE_SUBSCRIPTION_GRACE_DAYS,
+    ManualSubscription,
+    CoinbaseSubscription,
     SyncEvent,
+    SocialAuth,
+    User,
 )
-from tests.utils import login, create_new_user, random_token
+from tests.utils import login, create_new_user, random_token, random_email
 
 
 def test_generate_email(flask_client):
@@ -386,3 +390,55 @@ def test_sync_event_dead_letter():
     assert e3 not in dead_letter_events
     assert e4 not in dead_letter_events
     assert e5 not in dead_letter_events
+
+
+def test_social_auth_record_is_idempotent(flask_client):
+    user = create_new_user()
+
+    SocialAuth.record(user.id, "github")
+    SocialAuth.record(user.id, "github")
+    SocialAuth.record(user.id, "google")
+
+    assert SocialAuth.filter_by(user_id=user.id, social="github").count() == 1
+    assert SocialAuth.filter_by(user_id=user.id).count() == 2
+
+
+def test_user_get_by_email_or_canonical_email(flask_client):
+    user = create_new_user()
+    canonical_user = create_new_user()
+
+    assert (
+        User.get_by_email_or_canonical_email(user.email, canonical_user.email) == user
+    )
+    assert (
+        User.get_by_email_or_canonical_email(random_email(), canonical_user.email)
+        == canonical_user
+    )
+    assert User.get_by_email_or_canonical_email(user.email, user.email) == user
+    assert User.get_by_email_or_canonical_email(random_email(), random_email()) is None
+
+
+def test_is_paid_clause():
+    now = arrow.now()
+    free_user = create_new_user()
+    paid_user = create_new_user()
+    ManualSubscription.create(user_id=paid_user.id, end_at=now.shift(days=1))
+    # the active giveaway hides the coinbase subscription in is_paid()
+    giveaway_user = create_new_user()
+    ManualSubscription.create(
+        user_id=giveaway_user.id, end_at=now.shift(days=1), is_giveaway=True
+    )
+    CoinbaseSubscription.create(user_id=giveaway_user.id, end_at=now.shift(days=1))
+    Session.flush()
+
+    users = [free_user, paid_user, giveaway_user]
+    paid_ids = {
+        user_id
+        for (user_id,) in Session.query(User.id).filter(
+            User.id.in_([user.id for user in users]), User.is_paid_clause()
+        )
+    }
+
+    assert paid_ids == {paid_user.id}
+    for user in users:
+        assert user.is_paid() == (user.id in paid_ids)
@@ -5,6 +5,7 @@ import pgpy
 import pytest
 from pgpy import PGPMessage
 
+from app import pgp_utils
 from app.config import ROOT_DIR
 from app.pgp_utils import (
     load_public_key,
@@ -15,6 +16,8 @@ from app.pgp_utils import (
     sign_data_with_pgpy,
     create_pgp_context,
     load_public_key_and_check,
+    check_public_key,
+    PGPException,
 )
 
 
@@ -177,3 +180,23 @@ class TestBothImplementations:
         signature = sign_data(b"data to sign", ctx, force_use_rust=use_rust)
         assert signature != ""
         assert "-----BEGIN PGP SIGNATURE-----" in signature
+
+
+def test_check_public_key(public_key, monkeypatch):
+    pgp_utils._check_public_key.cache_clear()
+    loaded_keys = []
+
+    def load_and_check(key, ctx):
+        loaded_keys.append(key)
+        return load_public_key_and_check(key, ctx)
+
+    monkeypatch.setattr(pgp_utils, "load_public_key_and_check", load_and_check)
+
+    fingerprint = check_public_key(public_key)
+    assert fingerprint != ""
+    # same key is returned from the cache without being loaded again
+    assert check_public_key(public_key) == fingerprint
+    assert loaded_keys == [public_key]
+
+    with pytest.raises(PGPException):
+        check_public_key("invalid key")